@@ -1,6 +1,7 @@
 import warnings
 
-from .local_materials import CropSettings, VideoMaterial, AudioMaterial
+from .local_materials import CropSettings, VideoMaterial, AudioMaterial, LazyVideoMaterial, LazyAudioMaterial
+from .local_materials import MaterialBatch, load_materials, aload_materials
 from .keyframe import KeyframeProperty
 
 from .time_util import Timerange
@@ -210,6 +211,11 @@ __all__ = [
     "CropSettings",
     "VideoMaterial",
     "AudioMaterial",
+    "LazyVideoMaterial",
+    "LazyAudioMaterial",
+    "MaterialBatch",
+    "load_materials",
+    "aload_materials",
     "KeyframeProperty",
     "Timerange",
     "AudioSegment",
@@ -0,0 +1,66 @@
+"""供asyncio程序使用的异步接口的支持, 将读取素材、保存草稿等阻塞操作放到有界线程池中执行
+
+同时进行的素材读取数量另受信号量限制, 以免大量并发的读取占满线程池而使保存等操作长时间排队
+"""
+
+import asyncio
+import weakref
+import functools
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, TypeVar, Any
+
+_T = TypeVar("_T")
+
+_MAX_WORKERS: int = 8
+_MAX_PROBES: int = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+_probe_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+"""各事件循环各自的素材读取信号量, asyncio的信号量不能跨事件循环使用"""
+
+def configure(*, max_workers: Optional[int] = None, max_concurrent_probes: Optional[int] = None) -> None:
+    """设置异步接口所用的线程池
+
+    Args:
+        max_workers (`int`, optional): 线程池的线程数, 不指定则保持不变, 初始为8. 修改后, 已提交的任务仍在原线程池中完成.
+        max_concurrent_probes (`int`, optional): 同一事件循环中同时进行的素材读取数量上限, 不指定则保持不变, 初始为4.
+    """
+    global _MAX_WORKERS, _MAX_PROBES, _executor
+    with _lock:
+        if max_workers is not None:
+            if max_workers < 1:
+                raise ValueError("max_workers 至少为1")
+            _MAX_WORKERS = max_workers
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+                _executor = None
+        if max_concurrent_probes is not None:
+            if max_concurrent_probes < 1:
+                raise ValueError("max_concurrent_probes 至少为1")
+            _MAX_PROBES = max_concurrent_probes
+            _probe_semaphores.clear()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="pyJianYingDraft-async")
+        return _executor
+
+async def run_blocking(func: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+    """在线程池中执行阻塞的函数并等待其结果"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+async def run_probe(func: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+    """在线程池中执行读取素材的函数并等待其结果, 同时进行的读取数量受`max_concurrent_probes`限制"""
+    loop = asyncio.get_running_loop()
+    semaphore = _probe_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _probe_semaphores[loop] = asyncio.Semaphore(_MAX_PROBES)
+    async with semaphore:
+        return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
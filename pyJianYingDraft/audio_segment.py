@@ -4,14 +4,13 @@
 """
 
 import uuid
-from copy import deepcopy
 
 from typing import Optional, Literal, Union
 from typing import Dict, List, Any
 
 from .time_util import tim, Timerange
 from .segment import MediaSegment
-from .local_materials import AudioMaterial
+from .local_materials import intern_material, AudioMaterial
 from .keyframe import KeyframeProperty, KeyframeList
 
 from .metadata import EffectParamInstance
@@ -133,7 +132,7 @@ class AudioSegment(MediaSegment):
             volume (`float`, optional): 音量, 默认为1.0
 
         Raises:
-            `ValueError`: 指定的或计算出的`source_timerange`超出了素材的时长范围
+            `ValueError`: 指定的或计算出的`source_timerange`超出了素材的时长范围. 对时长未知的`LazyAudioMaterial`, 此检查推迟至`check_source_timerange`被调用时进行.
         """
         if isinstance(material, str):
             material = AudioMaterial(material)
@@ -146,15 +145,30 @@ class AudioSegment(MediaSegment):
             speed = speed if speed is not None else 1.0
             source_timerange = Timerange(0, round(target_timerange.duration * speed))
 
-        if source_timerange.end > material.duration:
-            raise ValueError(f"截取的素材时间范围 {source_timerange} 超出了素材时长({material.duration})")
-
         super().__init__(material.material_id, source_timerange, target_timerange, speed, volume)
 
-        self.material_instance = deepcopy(material)
+        # 不在此处读取延迟加载的素材的时长, 相应检查推迟至放入草稿或导出时进行
+        self._source_checked = self._check_source_end(material, force=False)
+        self.material_instance = intern_material(material)  # type: ignore
         self.fade = None
         self.effects = []
 
+    def check_source_timerange(self, *, force: bool = True) -> bool:
+        """检查截取的素材时间范围是否超出了素材时长, 已完成的检查不会重复进行
+
+        Args:
+            force (`bool`, optional): 素材为时长未知的`LazyAudioMaterial`时是否读取素材以完成检查, 否则继续推迟. 默认为是.
+
+        Returns:
+            `bool`: 是否已完成检查
+
+        Raises:
+            `ValueError`: 截取的素材时间范围超出了素材时长
+        """
+        if not self._source_checked:
+            self._source_checked = self._check_source_end(self.material_instance, force)
+        return self._source_checked
+
     def add_effect(self, effect_type: Union[AudioSceneEffectType, ToneEffectType, SpeechToSongType],
                    params: Optional[List[Optional[float]]] = None) -> "AudioSegment":
         """为音频片段添加一个作用于整个片段的音频效果, 目前"声音成曲"效果不能自动被剪映所识别
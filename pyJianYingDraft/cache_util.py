@@ -0,0 +1,74 @@
+"""各缓存模块(`media_probe`, `template_cache`, `waveform`, `scene_index`等)共用的工具"""
+
+import os
+import threading
+
+from collections import OrderedDict
+from typing import Optional, Generic, Hashable, TypeVar
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+class LruCache(Generic[_K, _V]):
+    """线程安全的内存缓存, 超出容量时淘汰最久未使用者"""
+
+    max_entries: int
+    """最多缓存的条目数, 为0时不缓存任何内容"""
+
+    def __init__(self, max_entries: int):
+        self._entries: "OrderedDict[_K, _V]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = 0
+        self.resize(max_entries)
+
+    def resize(self, max_entries: int) -> None:
+        """修改容量, 并淘汰超出新容量的条目"""
+        if max_entries < 0:
+            raise ValueError("max_entries 不能为负数")
+        with self._lock:
+            self.max_entries = max_entries
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: _K) -> Optional[_V]:
+        """获取缓存的值并将其标记为最近使用, 不存在时返回None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: _K, value: _V) -> None:
+        """缓存给定的值, 容量为0时不做任何事"""
+        with self._lock:
+            if self.max_entries == 0:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def prepare_cache_dir(cache_dir: Optional[str]) -> Optional[str]:
+    """创建磁盘缓存目录(若不存在)并原样返回之, 为None时表示禁用磁盘缓存"""
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def import_numpy(purpose: str):
+    """导入NumPy, 未安装时抛出注明用途的`ImportError`
+
+    Args:
+        purpose (`str`): 需要NumPy的功能, 如"生成音频波形"
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("%s需要安装NumPy (pip install numpy)" % purpose) from None
+    return numpy
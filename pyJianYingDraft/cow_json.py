@@ -0,0 +1,177 @@
+"""写时复制(copy-on-write)的JSON容器, 用于在模板模式下共享解析得到的草稿数据
+
+被包装的原始数据永远不会被修改: 首次写入某个字典或列表时, 仅浅复制该容器及其各级父容器, 其余部分仍与原始数据共享
+"""
+
+from copy import deepcopy
+
+from typing import Optional, Union, overload
+from typing import Dict, List, Any, Iterator, MutableMapping, MutableSequence
+
+Container = Union[Dict[str, Any], List[Any]]
+
+class CowNode:
+    """写时复制容器的基类"""
+
+    _base: Container
+    """共享的原始容器, 不会被修改"""
+    _own: Optional[Container]
+    """首次写入时复制出的私有容器"""
+    _parent: Optional["CowNode"]
+    """父容器的包装, 根容器为None"""
+    _key: Any
+    """在父容器中的键或下标"""
+    _children: Dict[int, "CowNode"]
+    """以子容器的id为键缓存的子容器包装"""
+
+    def __init__(self, base: Container, parent: Optional["CowNode"] = None, key: Any = None):
+        self._base = base
+        self._own = None
+        self._parent = parent
+        self._key = key
+        self._children = {}
+
+    def _current(self) -> Container:
+        return self._base if self._own is None else self._own
+
+    def unwrap(self) -> Container:
+        """返回当前内容对应的普通字典或列表, 其中未修改的部分与原始数据共享, 调用者不应修改其内容"""
+        return self._current()
+
+    @property
+    def modified(self) -> bool:
+        """是否已被写入过, 写入任一子容器也视为写入了本容器"""
+        return self._own is not None
+
+    def _wrap(self, key: Any, value: Any) -> Any:
+        """将子容器包装为写时复制容器, 其余值原样返回"""
+        if isinstance(value, dict):
+            cls = CowDict
+        elif isinstance(value, list):
+            cls = CowList
+        else:
+            return value
+
+        child = self._children.get(id(value))
+        if child is None or child._current() is not value:
+            child = cls(value, self, key)
+            self._children[id(value)] = child
+        else:
+            child._key = key  # 列表下标可能已发生变化
+        return child
+
+    def _materialize(self) -> Container:
+        """确保已复制出私有容器, 并将其链接到父容器中"""
+        if self._own is not None:
+            return self._own
+
+        own = dict(self._base) if isinstance(self._base, dict) else list(self._base)
+        parent = self._parent
+        if parent is not None:
+            container = parent._materialize()
+            # 若在父容器中的位置已被替换, 则本容器已与父容器脱离, 不再回写
+            if isinstance(container, list):
+                index = self._key
+                if not (0 <= index < len(container) and container[index] is self._base):
+                    index = next((i for i, v in enumerate(container) if v is self._base), None)
+                if index is not None:
+                    container[index] = own
+            elif container.get(self._key) is self._base:
+                container[self._key] = own
+            if parent._children.get(id(self._base)) is self:
+                del parent._children[id(self._base)]
+            parent._children[id(own)] = self
+        self._own = own
+        return own
+
+    def __eq__(self, other: object) -> bool:
+        return self._current() == unwrap(other)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._current()!r})"
+
+    def __copy__(self) -> Container:
+        """复制得到普通的字典或列表, 由于私有容器会被原地修改, 此处总是进行深复制"""
+        return deepcopy(self._current())
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Container:
+        """深复制得到普通的字典或列表"""
+        return deepcopy(self._current(), memo)
+
+class CowDict(CowNode, MutableMapping[str, Any]):
+    """写时复制的JSON对象"""
+
+    _base: Dict[str, Any]
+
+    def __init__(self, base: Dict[str, Any], parent: Optional[CowNode] = None, key: Any = None):
+        super().__init__(base, parent, key)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._wrap(key, self._current()[key])  # type: ignore
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._materialize()[key] = _plain(value)  # type: ignore
+
+    def __delitem__(self, key: str) -> None:
+        del self._materialize()[key]  # type: ignore
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._current())
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._current()
+
+    def fork(self) -> "CowDict":
+        """返回内容相同且相互独立的写时复制容器, 本容器未被写入时二者共享原始数据, 无需复制"""
+        return CowDict(self._base if self._own is None else deepcopy(self._own))
+
+class CowList(CowNode, MutableSequence[Any]):
+    """写时复制的JSON数组"""
+
+    _base: List[Any]
+
+    def __init__(self, base: List[Any], parent: Optional[CowNode] = None, key: Any = None):
+        super().__init__(base, parent, key)
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[Any]: ...
+
+    def __getitem__(self, index):
+        current = self._current()
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(current)))]
+        if index < 0:
+            index += len(current)
+        return self._wrap(index, current[index])
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            self._materialize()[index] = [_plain(v) for v in value]
+        else:
+            self._materialize()[index] = _plain(value)
+
+    def __delitem__(self, index) -> None:
+        del self._materialize()[index]
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    def insert(self, index: int, value: Any) -> None:
+        self._materialize().insert(index, _plain(value))  # type: ignore
+
+def _plain(value: Any) -> Any:
+    """写入容器前将写时复制容器转为独立的普通容器, 以免与其它数据产生关联"""
+    if isinstance(value, CowNode):
+        return deepcopy(value)
+    return value
+
+def unwrap(value: Any) -> Any:
+    """若为写时复制容器则返回其当前内容, 否则原样返回"""
+    if isinstance(value, CowNode):
+        return value.unwrap()
+    return value
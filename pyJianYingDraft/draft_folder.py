@@ -6,6 +6,7 @@ import shutil
 from typing import List
 
 from . import assets
+from . import template_cache
 from .script_file import ScriptFile
 
 class DraftFolder:
@@ -103,14 +104,15 @@ class DraftFolder:
         if not os.path.exists(draft_path):
             raise FileNotFoundError(f"草稿文件夹 {draft_name} 不存在")
 
-        script_file = self.load_template(draft_name)
+        script_file = self.load_template(draft_name, lazy=True)
         script_file.inspect_material()
 
-    def load_template(self, draft_name: str) -> ScriptFile:
+    def load_template(self, draft_name: str, *, lazy: bool = False) -> ScriptFile:
         """在文件夹中打开一个草稿作为模板, 并在其上进行编辑
 
         Args:
             draft_name (`str`): 草稿名称, 即相应文件夹名称
+            lazy (`bool`, optional): 是否按需加载模板内容, 参见`ScriptFile.load_template`. 默认为否.
 
         Returns:
             `ScriptFile`: 以模板模式打开的草稿对象
@@ -122,15 +124,17 @@ class DraftFolder:
         if not os.path.exists(draft_path):
             raise FileNotFoundError(f"草稿文件夹 {draft_name} 不存在")
 
-        return ScriptFile.load_template(os.path.join(draft_path, "draft_content.json"))
+        return ScriptFile.load_template(os.path.join(draft_path, "draft_content.json"), lazy=lazy)
 
-    def duplicate_as_template(self, template_name: str, new_draft_name: str, allow_replace: bool = False) -> ScriptFile:
+    def duplicate_as_template(self, template_name: str, new_draft_name: str, allow_replace: bool = False, *,
+                              lazy: bool = False) -> ScriptFile:
         """复制一份给定的草稿, 并在复制出的新草稿上进行编辑
 
         Args:
             template_name (`str`): 原草稿名称
             new_draft_name (`str`): 新草稿名称
             allow_replace (`bool`, optional): 是否允许覆盖与`new_draft_name`重名的草稿. 默认为否.
+            lazy (`bool`, optional): 是否按需加载模板内容, 参见`ScriptFile.load_template`. 默认为否.
 
         Returns:
             `ScriptFile`: 以模板模式打开的**复制后的**草稿对象
@@ -148,6 +152,9 @@ class DraftFolder:
 
         # 复制草稿文件夹
         shutil.copytree(template_path, new_draft_path, dirs_exist_ok=allow_replace)
+        # 副本与原草稿内容相同, 直接复用原草稿的解析结果
+        template_cache.alias(os.path.join(new_draft_path, "draft_content.json"),
+                             os.path.join(template_path, "draft_content.json"))
 
         # 打开草稿
-        return self.load_template(new_draft_name)
+        return self.load_template(new_draft_name, lazy=lazy)
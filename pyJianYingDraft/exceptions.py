@@ -21,3 +21,5 @@ class AutomationError(Exception):
     """自动化操作失败"""
 class ExportTimeout(Exception):
     """导出超时"""
+class MaterialLoadFailed(ValueError):
+    """批量加载素材时有素材加载失败"""
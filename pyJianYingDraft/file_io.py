@@ -0,0 +1,246 @@
+"""草稿文件的原子写入, 以及用于异步保存的后台写入线程
+
+原子写入时先写入同目录下的临时文件并落盘, 再将其重命名为目标文件, 从而保证目标文件要么保持原样, 要么为完整的新内容.
+跳过未变化的写入时, 比较新内容与现有文件的指纹(BLAKE2b摘要), 二者一致时不触碰现有文件
+"""
+
+import os
+import stat
+import hashlib
+import tempfile
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Union, Callable, Iterable, Sequence, TypeVar
+from typing import List, Tuple
+
+from .cache_util import LruCache
+
+_T = TypeVar("_T")
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+_UMASK: int = _current_umask()
+"""进程启动时的umask, 用于确定新建文件的权限. 读取umask需临时修改之, 故只在导入时读取一次"""
+
+def _target_mode(file_path: str) -> int:
+    """替换`file_path`的文件应有的权限: 目标文件已存在时沿用其权限, 否则为以`open`新建文件时的默认权限"""
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+def atomic_write(file_path: str, chunks: Iterable[Union[str, bytes]], *, binary: bool = False) -> None:
+    """以原子方式将文本写入文件
+
+    Args:
+        file_path (`str`): 目标文件路径
+        chunks (`Iterable[str]` or `Iterable[bytes]`): 要写入的内容, 可以是逐块产生的迭代器
+        binary (`bool`, optional): `chunks`是否为字节串, 此时原样写入. 默认为否, 即以UTF-8编码写入文本.
+    """
+    _replace_file(file_path, chunks, binary=binary)
+
+def _replace_file(file_path: str, chunks: Iterable[Union[str, bytes]], *, binary: bool,
+                  sync: bool = True, hashed: bool = False, old_digest: Optional[bytes] = None) -> Optional[bytes]:
+    """先写入同目录下的临时文件, 再将其重命名为目标文件
+
+    Args:
+        sync (`bool`, optional): 是否将临时文件及重命名操作落盘. 默认为是.
+        hashed (`bool`, optional): 是否在写入的同时计算新内容的指纹, 此时`chunks`须为字节串. 默认为否.
+        old_digest (`bytes`, optional): 现有文件的指纹, 计算了指纹且与之一致时放弃替换.
+
+    Returns:
+        `Optional[bytes]`: 计算了指纹时为新内容的指纹, 若因内容未变化而放弃替换则为None; 否则总为None
+    """
+    dir_name = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=dir_name, prefix=os.path.basename(file_path) + ".", suffix=".tmp")
+    digest: Optional[bytes] = None
+    try:
+        with (os.fdopen(fd, "wb") if binary else os.fdopen(fd, "w", encoding="utf-8")) as f:
+            if not hashed:
+                f.writelines(chunks)
+            else:
+                h = _new_hash()
+                for block in chunks:
+                    h.update(block)  # type: ignore
+                    f.write(block)
+                digest = h.digest()
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        if hashed and digest == old_digest:
+            os.remove(tmp_path)
+            return None
+        # mkstemp创建的临时文件权限为0600, 需在替换前恢复为目标文件应有的权限
+        os.chmod(tmp_path, _target_mode(file_path))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if sync:
+        _fsync_dir(dir_name)
+    return digest
+
+def _fsync_dir(dir_name: str) -> None:
+    """将目录项的修改(即重命名操作)落盘, 在不支持打开目录的平台(如Windows)上不做任何事"""
+    try:
+        fd = os.open(dir_name, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _new_hash() -> "hashlib.blake2b":
+    return hashlib.blake2b(digest_size=16)
+
+_fingerprints: "LruCache[str, Tuple[int, int, bytes]]" = LruCache(4096)
+"""已知文件的指纹, 以绝对路径为键, 值为`(st_mtime_ns, st_size, 指纹)`, 避免重复读取同一文件"""
+
+def _stat_key(file_path: str) -> Optional[Tuple[str, int, int]]:
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        return None
+    return (os.path.abspath(file_path), stat_result.st_mtime_ns, stat_result.st_size)
+
+def file_fingerprint(file_path: str) -> Optional[bytes]:
+    """计算文件内容的指纹, 文件不存在时返回None. 未变化的文件的指纹会被缓存"""
+    key = _stat_key(file_path)
+    if key is None:
+        return None
+    cached = _fingerprints.get(key[0])
+    if cached is not None and cached[:2] == key[1:]:
+        return cached[2]
+
+    h = _new_hash()
+    try:
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    except OSError:
+        return None
+    _remember_fingerprint(file_path, h.digest(), key)
+    return h.digest()
+
+def _remember_fingerprint(file_path: str, digest: bytes, key: Optional[Tuple[str, int, int]] = None) -> None:
+    key = key or _stat_key(file_path)
+    if key is None:
+        return
+    _fingerprints.put(key[0], (key[1], key[2], digest))
+
+def _encoded(chunks: Iterable[Union[str, bytes]]) -> Iterable[bytes]:
+    for chunk in chunks:
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+def _write_if_changed(file_path: str, chunks: Iterable[Union[str, bytes]], *, atomic: bool) -> bool:
+    old_digest = file_fingerprint(file_path)
+
+    if isinstance(chunks, Sequence):
+        # 内容已在内存中, 先比较指纹再决定是否写入
+        data = list(_encoded(chunks))
+        h = _new_hash()
+        for block in data:
+            h.update(block)
+        if h.digest() == old_digest:
+            return False
+        if atomic:
+            atomic_write(file_path, data, binary=True)
+        else:
+            with open(file_path, "wb") as f:
+                f.writelines(data)
+        _remember_fingerprint(file_path, h.digest())
+        return True
+
+    # 流式产生的内容, 边计算指纹边写入临时文件, 内容变化时才替换目标文件
+    digest = _replace_file(file_path, _encoded(chunks), binary=True, sync=atomic, hashed=True,
+                           old_digest=old_digest)
+    if digest is None:
+        return False
+    _remember_fingerprint(file_path, digest)
+    return True
+
+def write_file(file_path: str, chunks: Iterable[Union[str, bytes]], *, binary: bool = False,
+               atomic: bool = False, skip_unchanged: bool = False) -> bool:
+    """将内容写入文件, 并将结果计入保存报告
+
+    Args:
+        file_path (`str`): 目标文件路径
+        chunks (`Iterable[str]` or `Iterable[bytes]`): 要写入的内容, 可以是逐块产生的迭代器
+        binary (`bool`, optional): `chunks`是否为字节串. 默认为否, 即以UTF-8编码写入文本.
+        atomic (`bool`, optional): 是否原子写入, 参见`atomic_write`. 默认为否.
+        skip_unchanged (`bool`, optional): 新内容与现有文件完全一致时是否跳过写入, 从而保持其修改时间不变.
+            此时文本内容总是以UTF-8编码原样写入, 不进行换行符转换. 默认为否.
+
+    Returns:
+        `bool`: 是否实际写入了文件
+    """
+    if skip_unchanged:
+        written = _write_if_changed(file_path, chunks, atomic=atomic)
+    elif atomic:
+        atomic_write(file_path, chunks, binary=binary)
+        written = True
+    else:
+        with (open(file_path, "wb") if binary else open(file_path, "w", encoding="utf-8")) as f:
+            f.writelines(chunks)  # type: ignore
+        written = True
+
+    _report.add(file_path, written)
+    return written
+
+class SaveReport:
+    """记录各次保存是实际写入了文件, 还是因内容未变化而被跳过"""
+
+    written: List[str]
+    """实际写入的文件路径"""
+    skipped: List[str]
+    """因内容未变化而跳过写入的文件路径"""
+
+    def __init__(self):
+        self.written = []
+        self.skipped = []
+        self._lock = threading.Lock()
+
+    def add(self, file_path: str, written: bool) -> None:
+        with self._lock:
+            (self.written if written else self.skipped).append(file_path)
+
+    def summary(self) -> str:
+        """返回形如`written 3, skipped 97`的统计信息"""
+        return "written %d, skipped %d" % (len(self.written), len(self.skipped))
+
+    def __repr__(self) -> str:
+        return "SaveReport(%s)" % self.summary()
+
+_report = SaveReport()
+
+def get_save_report() -> SaveReport:
+    """获取自进程启动或上次重置以来的保存报告"""
+    return _report
+
+def reset_save_report() -> SaveReport:
+    """重置保存报告, 并返回重置前的报告"""
+    global _report
+    report, _report = _report, SaveReport()
+    return report
+
+_writer: Optional[ThreadPoolExecutor] = None
+_writer_lock = threading.Lock()
+
+def submit_write(func: Callable[[], _T]) -> "Future[_T]":
+    """将写入任务提交至全局唯一的后台写入线程, 各任务按提交顺序依次执行"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyJianYingDraft-writer")
+        return _writer.submit(func)
@@ -0,0 +1,135 @@
+"""在原始JSON文本上定位并替换个别值, 用于模板模式下的补丁保存
+
+补丁保存时仅将发生变化的值写入原文件内容的相应字节范围, 其余内容原样保留, 无需重新编码整个草稿
+"""
+
+import re
+import json
+
+from typing import Optional, Tuple, Union
+from typing import Dict, List, Any
+
+Json_path = Tuple[Union[str, int], ...]
+"""值在JSON文档中的路径, 由各级的键或下标组成"""
+Span = Tuple[int, int]
+"""值在原始文本中的字节范围, 左闭右开"""
+
+_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]:,]|[^\s{}\[\],:"]+')
+
+class _Frame:
+    """扫描时正在处理的对象或数组"""
+
+    __slots__ = ("is_object", "key", "start", "path", "relevant")
+
+    is_object: bool
+    key: Union[str, int, None]
+    """当前元素的键或下标, 对象中尚未读到键时为None"""
+    start: int
+    path: Json_path
+    """此容器自身的路径"""
+    relevant: bool
+    """是否记录此容器中各元素的位置"""
+
+    def __init__(self, is_object: bool, start: int, path: Json_path, relevant: bool):
+        self.is_object = is_object
+        self.key = None if is_object else 0
+        self.start = start
+        self.path = path
+        self.relevant = relevant
+
+def index_draft_values(data: bytes) -> Dict[Json_path, Span]:
+    """扫描草稿文件的原始内容, 记录各顶层字段及`materials`下各素材的各字段的值的位置
+
+    即记录形如`("fps",)`及`("materials", "videos", 0, "path")`的路径所对应的字节范围
+
+    Raises:
+        `ValueError`: 内容不是合法的JSON对象
+    """
+    spans: Dict[Json_path, Span] = {}
+    stack: List[_Frame] = []
+    expect_key = False
+
+    def is_relevant(path: Json_path) -> bool:
+        return len(path) < 4 and (len(path) == 0 or path[0] == "materials")
+
+    for match in _TOKEN.finditer(data):
+        token = match.group()
+        head = token[:1]
+        if head == b"{" or head == b"[":
+            if stack:
+                parent = stack[-1]
+                path = parent.path + (parent.key,)  # type: ignore
+                relevant = parent.relevant and is_relevant(path)
+            else:
+                path, relevant = (), True
+            stack.append(_Frame(head == b"{", match.start(), path, relevant))
+            expect_key = head == b"{"
+        elif head == b"}" or head == b"]":
+            if not stack:
+                raise ValueError("JSON格式错误: 多余的 '%s'" % token.decode())
+            frame = stack.pop()
+            if stack and stack[-1].relevant:
+                spans[frame.path] = (frame.start, match.end())
+            expect_key = False
+            if not stack:
+                break
+            if frame.path == ("materials",) and ("fps",) in spans and ("duration",) in spans:
+                break  # 其后的内容(通常为轨道)无需扫描
+        elif head == b":":
+            expect_key = False
+        elif head == b",":
+            frame = stack[-1]
+            if frame.is_object:
+                expect_key = True
+            else:
+                frame.key += 1  # type: ignore
+        elif expect_key:
+            stack[-1].key = json.loads(token) if stack[-1].relevant else ""
+        else:
+            if not stack:
+                raise ValueError("JSON格式错误: 顶层不是对象")
+            frame = stack[-1]
+            if frame.relevant:
+                spans[frame.path + (frame.key,)] = (match.start(), match.end())  # type: ignore
+
+    return spans
+
+def diff_materials(original: Dict[str, List[Dict[str, Any]]],
+                   current: Dict[str, List[Dict[str, Any]]]) -> Optional[Dict[Json_path, Any]]:
+    """比较素材部分, 返回发生变化或新增的各素材字段的路径及新值
+
+    仅当素材的种类及数量均未变化, 且没有素材的字段被删除时才能以补丁方式写入, 否则返回None.
+    未修改的部分在写时复制下与原始数据为同一对象, 故比较开销很小
+    """
+    if current is original:
+        return {}
+    if current.keys() != original.keys():
+        return None
+
+    changes: Dict[Json_path, Any] = {}
+    for material_type, material_list in current.items():
+        original_list = original[material_type]
+        if material_list is original_list:
+            continue
+        if len(material_list) != len(original_list):
+            return None
+        for index, (mat, original_mat) in enumerate(zip(material_list, original_list)):
+            if mat is original_mat:
+                continue
+            if not isinstance(mat, dict) or not isinstance(original_mat, dict) or not mat.keys() >= original_mat.keys():
+                return None
+            for key, value in mat.items():
+                if key not in original_mat or (value is not original_mat[key] and value != original_mat[key]):
+                    changes[("materials", material_type, index, key)] = value
+    return changes
+
+def splice(data: bytes, replacements: List[Tuple[int, int, bytes]]) -> bytes:
+    """将原始内容中的若干字节范围`[start, end)`替换为新内容, 各范围不应重叠; `start`与`end`相等时即为插入"""
+    parts: List[bytes] = []
+    last = 0
+    for start, end, new_bytes in sorted(replacements, key=lambda item: (item[0], item[1])):
+        parts.append(data[last:start])
+        parts.append(new_bytes)
+        last = end
+    parts.append(data[last:])
+    return b"".join(parts)
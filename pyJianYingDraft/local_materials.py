@@ -1,12 +1,76 @@
 import os
+import copy
 import uuid
-import pymediainfo
+import weakref
+import threading
 
-from typing import Optional, Literal
-from typing import Dict, Any
+import asyncio
 
-class CropSettings:
-    """素材的裁剪设置, 各属性均在0-1之间, 注意素材的坐标原点在左上角"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Literal, Union, Hashable, Sequence, Tuple
+from typing import Dict, List, Any
+
+from . import media_probe
+from . import waveform
+from . import async_io
+from . import exceptions
+
+Material_id_mode = Literal["name", "content"]
+"""素材id的生成方式: `name`表示由素材名称生成, `content`表示由文件内容生成"""
+
+def _make_material_id(path: str, material_name: str, id_mode: Material_id_mode) -> str:
+    if id_mode == "content":
+        return media_probe.content_id(path)
+    if id_mode == "name":
+        return uuid.uuid3(uuid.NAMESPACE_DNS, material_name).hex
+    raise ValueError("不支持的素材id生成方式: '%s'" % id_mode)
+
+class _Freezable:
+    """被片段引用后即不可再修改的对象, 从而可以在多个片段之间共享同一实例"""
+
+    _frozen: bool = False
+    """是否已被冻结"""
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._frozen and not name.startswith("_"):
+            raise AttributeError("%s 已被片段引用, 不可再修改; 请创建新的实例(裁剪设置可使用`VideoMaterial.with_crop`)"
+                                 % type(self).__name__)
+        super().__setattr__(name, value)
+
+    def _freeze(self) -> None:
+        object.__setattr__(self, "_frozen", True)
+
+    def _thaw_copy(self):
+        """返回一份未冻结的浅拷贝"""
+        new = copy.copy(self)
+        object.__setattr__(new, "_frozen", False)
+        return new
+
+_interned: "weakref.WeakValueDictionary[Hashable, Union[VideoMaterial, AudioMaterial]]" = weakref.WeakValueDictionary()
+"""各片段所共享的素材实例, 以`_intern_key`为键"""
+_intern_lock = threading.Lock()
+
+def intern_material(material: "Union[VideoMaterial, AudioMaterial]") -> "Union[VideoMaterial, AudioMaterial]":
+    """返回与给定素材等价的共享实例并将其冻结, 构造片段时自动调用
+
+    等价即素材id、名称、路径、裁剪设置及素材信息(时长、尺寸等)均相同. 若尚无等价的共享实例, 则冻结并登记`material`本身
+    """
+    key = material._intern_key()
+    with _intern_lock:
+        existing = _interned.get(key)
+        if existing is not None:
+            return existing
+        if isinstance(material, VideoMaterial):
+            material.crop_settings._freeze()
+        material._freeze()
+        _interned[key] = material
+    return material
+
+class CropSettings(_Freezable):
+    """素材的裁剪设置, 各属性均在0-1之间, 注意素材的坐标原点在左上角
+
+    被片段引用后即不可再修改
+    """
 
     upper_left_x: float
     upper_left_y: float
@@ -43,11 +107,14 @@ class CropSettings:
             "lower_right_y": self.lower_right_y
         }
 
-class VideoMaterial:
-    """本地视频素材（视频或图片）, 一份素材可以在多个片段中使用"""
+class VideoMaterial(_Freezable):
+    """本地视频素材（视频或图片）, 一份素材可以在多个片段中使用
+
+    被片段引用后即被冻结且由各片段共享, 不可再修改, 如需不同的裁剪设置请使用`with_crop`
+    """
 
     material_id: str
-    """素材全局id, 自动生成"""
+    """素材全局id, 根据素材名称或文件内容自动生成"""
     local_material_id: str
     """素材本地id, 意义暂不明确"""
     material_name: str
@@ -65,54 +132,66 @@ class VideoMaterial:
     material_type: Literal["video", "photo"]
     """素材类型: 视频或图片"""
 
-    def __init__(self, path: str, material_name: Optional[str] = None, crop_settings: CropSettings = CropSettings()):
+    def __init__(self, path: str, material_name: Optional[str] = None, crop_settings: Optional[CropSettings] = None, *,
+                 id_mode: Material_id_mode = "name"):
         """从指定位置加载视频（或图片）素材
 
         Args:
             path (`str`): 素材文件路径, 支持mp4, mov, avi等常见视频文件及jpg, jpeg, png等图片文件.
             material_name (`str`, optional): 素材名称, 如果不指定, 默认使用文件名作为素材名称.
             crop_settings (`CropSettings`, optional): 素材裁剪设置, 默认不裁剪.
+            id_mode (`str`, optional): 素材id的生成方式, 默认为`name`, 即由素材名称生成.
+                为`content`时由文件内容生成, 此时不同位置的同名文件不会冲突, 而内容相同的文件会被视为同一素材.
+
+        素材信息的读取结果会被缓存, 参见`media_probe.configure`.
 
         Raises:
             `FileNotFoundError`: 素材文件不存在.
             `ValueError`: 不支持的素材文件类型.
         """
         path = os.path.abspath(path)
-        postfix = os.path.splitext(path)[1]
         if not os.path.exists(path):
             raise FileNotFoundError(f"找不到 {path}")
 
         self.material_name = material_name if material_name else os.path.basename(path)
-        self.material_id = uuid.uuid3(uuid.NAMESPACE_DNS, self.material_name).hex
+        self.material_id = _make_material_id(path, self.material_name, id_mode)
         self.path = path
-        self.crop_settings = crop_settings
+        self.crop_settings = crop_settings if crop_settings is not None else CropSettings()
         self.local_material_id = ""
 
-        if not pymediainfo.MediaInfo.can_parse():
-            raise ValueError(f"不支持的视频素材类型 '{postfix}'")
-
-        info: pymediainfo.MediaInfo = \
-            pymediainfo.MediaInfo.parse(path, mediainfo_options={"File_TestContinuousFileNames": "0"})  # type: ignore
-        # 有视频轨道的视为视频素材
-        if len(info.video_tracks):
-            self.material_type = "video"
-            self.duration = int(info.video_tracks[0].duration * 1e3)  # type: ignore
-            self.width, self.height = info.video_tracks[0].width, info.video_tracks[0].height  # type: ignore
-        # gif文件使用imageio库获取长度
-        elif postfix.lower() == ".gif":
-            import imageio
-            gif = imageio.get_reader(path)
-
-            self.material_type = "video"
-            self.duration = int(round(gif.get_meta_data()['duration'] * gif.get_length() * 1e3))
-            self.width, self.height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
-            gif.close()
-        elif len(info.image_tracks):
-            self.material_type = "photo"
-            self.duration = 10800000000  # 相当于3h
-            self.width, self.height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
-        else:
-            raise ValueError(f"输入的素材文件 {path} 没有视频轨道或图片轨道")
+        self._fill_info()
+
+    @classmethod
+    async def aload(cls, path: str, *args: Any, **kwargs: Any) -> "VideoMaterial":
+        """`VideoMaterial`构造函数的异步版本, 在线程池中读取素材, 参数与构造函数相同. 参见`async_io.configure`"""
+        return await async_io.run_probe(cls, path, *args, **kwargs)
+
+    def _fill_info(self) -> None:
+        """读取并设置素材的类型、时长及尺寸"""
+        info = media_probe.probe(self.path, "video")
+        self.material_type = info.material_type  # type: ignore
+        self.duration = info.duration
+        self.width, self.height = info.width, info.height
+
+    def with_crop(self, crop_settings: CropSettings) -> "VideoMaterial":
+        """返回使用给定裁剪设置的新素材, 原素材不受影响
+
+        若新的裁剪设置与原素材不同, 则新素材的id由原素材id及裁剪设置导出, 以便二者在同一草稿中共存
+        """
+        new = self._thaw_copy()
+        new.crop_settings = crop_settings
+        crop_values = tuple(crop_settings.export_json().values())
+        if crop_values != tuple(self.crop_settings.export_json().values()):
+            new.material_id = uuid.uuid3(uuid.NAMESPACE_DNS, "%s#crop=%r" % (self.material_id, crop_values)).hex
+        return new
+
+    def _intern_key(self) -> Hashable:
+        return (type(self), self.material_id, self.material_name, self.path,
+                tuple(self.crop_settings.export_json().values())) + self._info_key()
+
+    def _info_key(self) -> Tuple[Any, ...]:
+        """素材信息的读取结果, 使文件变化后重新创建的素材不会被视为与原先的素材等价"""
+        return (self.material_type, self.duration, self.width, self.height)
 
     def export_json(self) -> Dict[str, Any]:
         video_material_json = {
@@ -136,11 +215,11 @@ class VideoMaterial:
         }
         return video_material_json
 
-class AudioMaterial:
-    """本地音频素材"""
+class AudioMaterial(_Freezable):
+    """本地音频素材, 被片段引用后即被冻结且由各片段共享, 不可再修改"""
 
     material_id: str
-    """素材全局id, 自动生成"""
+    """素材全局id, 根据素材名称或文件内容自动生成"""
     material_name: str
     """素材名称"""
     path: str
@@ -148,13 +227,18 @@ class AudioMaterial:
 
     duration: int
     """素材时长, 单位为微秒"""
+    wave_points: List[float]
+    """波形数据, 为空时由剪映自行计算, 可通过`load_wave_points`生成"""
 
-    def __init__(self, path: str, material_name: Optional[str] = None):
+    def __init__(self, path: str, material_name: Optional[str] = None, *, id_mode: Material_id_mode = "name"):
         """从指定位置加载音频素材, 注意视频文件不应该作为音频素材使用
 
         Args:
             path (`str`): 素材文件路径, 支持mp3, wav等常见音频文件.
             material_name (`str`, optional): 素材名称, 如果不指定, 默认使用文件名作为素材名称.
+            id_mode (`str`, optional): 素材id的生成方式, 默认为`name`, 即由素材名称生成. 为`content`时由文件内容生成.
+
+        素材信息的读取结果会被缓存, 参见`media_probe.configure`.
 
         Raises:
             `FileNotFoundError`: 素材文件不存在.
@@ -165,17 +249,42 @@ class AudioMaterial:
             raise FileNotFoundError(f"找不到 {path}")
 
         self.material_name = material_name if material_name else os.path.basename(path)
-        self.material_id = uuid.uuid3(uuid.NAMESPACE_DNS, self.material_name).hex
+        self.material_id = _make_material_id(path, self.material_name, id_mode)
         self.path = path
+        self.wave_points = []
+
+        self._fill_info()
+
+    @classmethod
+    async def aload(cls, path: str, *args: Any, **kwargs: Any) -> "AudioMaterial":
+        """`AudioMaterial`构造函数的异步版本, 在线程池中读取素材, 参数与构造函数相同. 参见`async_io.configure`"""
+        return await async_io.run_probe(cls, path, *args, **kwargs)
+
+    def _fill_info(self) -> None:
+        """读取并设置素材的时长"""
+        self.duration = media_probe.probe(self.path, "audio").duration
+
+    def load_wave_points(self, points_per_second: int = waveform.POINTS_PER_SECOND) -> "AudioMaterial":
+        """计算素材的波形并写入草稿, 使剪映打开草稿时无需再行分析. 结果会被缓存, 参见`waveform.configure`
+
+        Args:
+            points_per_second (`int`, optional): 每秒音频所对应的波形点数, 默认为`waveform.POINTS_PER_SECOND`.
+
+        Raises:
+            `ImportError`: 未安装NumPy.
+            `ValueError`: 无法解码此素材, 如非WAV格式的素材需要ffmpeg才能解码.
+        """
+        # 波形只是派生数据, 故允许在被冻结后写入
+        object.__setattr__(self, "wave_points", waveform.compute_wave_points(self.path, points_per_second))
+        return self
+
+    def _intern_key(self) -> Hashable:
+        # 波形在被冻结后仍可写入, 故不计入
+        return (type(self), self.material_id, self.material_name, self.path) + self._info_key()
 
-        if not pymediainfo.MediaInfo.can_parse():
-            raise ValueError("不支持的音频素材类型 %s" % os.path.splitext(path)[1])
-        info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
-        if len(info.video_tracks):
-            raise ValueError("音频素材不应包含视频轨道")
-        if not len(info.audio_tracks):
-            raise ValueError(f"给定的素材文件 {path} 没有音频轨道")
-        self.duration = int(info.audio_tracks[0].duration * 1e3)  # type: ignore
+    def _info_key(self) -> Tuple[Any, ...]:
+        """素材信息的读取结果, 使文件变化后重新创建的素材不会被视为与原先的素材等价"""
+        return (self.duration,)
 
     def export_json(self) -> Dict[str, Any]:
         return {
@@ -194,5 +303,202 @@ class AudioMaterial:
             "path": self.path,
             "source_platform": 0,
             "type": "extract_music",
-            "wave_points": []
+            "wave_points": self.wave_points
         }
+
+class _LazyInfo:
+    """延迟读取素材信息的混入类, 各信息字段在首次被访问时才读取素材文件"""
+
+    _probe_kind: Literal["video", "audio"]
+    _probe_fields: Tuple[str, ...]
+    _known: Dict[str, Any]
+    """调用者提供的素材信息"""
+
+    def _fill_info(self) -> None:
+        for name, value in self._known.items():
+            setattr(self, name, value)
+
+    def __getattr__(self, name: str) -> Any:
+        # 仅在实例中尚无此属性时被调用
+        if name not in type(self)._probe_fields or "path" not in self.__dict__:
+            raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+        info = media_probe.probe(self.__dict__["path"], self._probe_kind)
+        for field in self._probe_fields:
+            if field not in self.__dict__:
+                object.__setattr__(self, field, getattr(info, field))  # 读取结果不视为修改
+        return self.__dict__[name]
+
+    def _info_key(self) -> Tuple[Any, ...]:
+        # 不为此读取素材文件, 而以调用者提供的信息及文件的大小和修改时间代替读取结果
+        try:
+            stat = os.stat(self.__dict__["path"])
+        except OSError:
+            return (tuple(sorted(self._known.items())), None)
+        return (tuple(sorted(self._known.items())), stat.st_size, stat.st_mtime_ns)
+
+    def is_known(self, name: str) -> bool:
+        """指定的素材信息是否已由调用者提供或已被读取, 即访问之不会触发对素材文件的读取"""
+        return name in self.__dict__
+
+class LazyVideoMaterial(_LazyInfo, VideoMaterial):
+    """延迟读取素材信息的本地视频素材, 在首次访问`duration`, `width`, `height`, `material_type`或导出时才读取素材文件
+
+    若调用者提供了全部素材信息, 则完全不读取素材文件. 可在任何接受`VideoMaterial`的位置使用
+    """
+
+    _probe_kind = "video"
+    _probe_fields = ("material_type", "duration", "width", "height")
+
+    def __init__(self, path: str, material_name: Optional[str] = None, crop_settings: Optional[CropSettings] = None, *,
+                 id_mode: Material_id_mode = "name", duration: Optional[int] = None,
+                 width: Optional[int] = None, height: Optional[int] = None,
+                 material_type: Optional[Literal["video", "photo"]] = None):
+        """从指定位置加载视频（或图片）素材, 但暂不读取素材信息
+
+        Args:
+            path (`str`): 素材文件路径, 支持mp4, mov, avi等常见视频文件及jpg, jpeg, png等图片文件.
+            material_name (`str`, optional): 素材名称, 如果不指定, 默认使用文件名作为素材名称.
+            crop_settings (`CropSettings`, optional): 素材裁剪设置, 默认不裁剪.
+            id_mode (`str`, optional): 素材id的生成方式, 参见`VideoMaterial`.
+            duration (`int`, optional): 已知的素材时长, 单位为微秒. 图片素材可不指定.
+            width (`int`, optional): 已知的素材宽度.
+            height (`int`, optional): 已知的素材高度.
+            material_type (`str`, optional): 已知的素材类型, `video`或`photo`. 指定了`duration`时默认为`video`.
+
+        未提供的素材信息将在首次访问时读取.
+
+        Raises:
+            `FileNotFoundError`: 素材文件不存在.
+        """
+        known: Dict[str, Any] = {"duration": duration, "width": width, "height": height, "material_type": material_type}
+        if material_type is None and duration is not None:
+            known["material_type"] = "video"
+        elif material_type == "photo" and duration is None:
+            known["duration"] = media_probe.PHOTO_DURATION
+        self._known = {name: value for name, value in known.items() if value is not None}
+        super().__init__(path, material_name, crop_settings, id_mode=id_mode)
+
+class LazyAudioMaterial(_LazyInfo, AudioMaterial):
+    """延迟读取素材信息的本地音频素材, 在首次访问`duration`或导出时才读取素材文件
+
+    若调用者提供了素材时长, 则完全不读取素材文件. 可在任何接受`AudioMaterial`的位置使用
+    """
+
+    _probe_kind = "audio"
+    _probe_fields = ("duration",)
+
+    def __init__(self, path: str, material_name: Optional[str] = None, *,
+                 id_mode: Material_id_mode = "name", duration: Optional[int] = None):
+        """从指定位置加载音频素材, 但暂不读取素材信息
+
+        Args:
+            path (`str`): 素材文件路径, 支持mp3, wav等常见音频文件.
+            material_name (`str`, optional): 素材名称, 如果不指定, 默认使用文件名作为素材名称.
+            id_mode (`str`, optional): 素材id的生成方式, 参见`AudioMaterial`.
+            duration (`int`, optional): 已知的素材时长, 单位为微秒. 不指定则在首次访问时读取.
+
+        Raises:
+            `FileNotFoundError`: 素材文件不存在.
+        """
+        self._known = {"duration": duration} if duration is not None else {}
+        super().__init__(path, material_name, id_mode=id_mode)
+
+class MaterialBatch:
+    """批量加载素材的结果"""
+
+    paths: List[str]
+    """各素材的文件路径, 与传入`load_materials`的顺序一致"""
+    materials: List[Optional[Union[VideoMaterial, AudioMaterial]]]
+    """加载得到的素材, 与`paths`一一对应, 加载失败者为None"""
+    errors: Dict[int, Exception]
+    """加载失败的素材的下标及相应异常"""
+
+    def __init__(self, paths: List[str]):
+        self.paths = paths
+        self.materials = [None] * len(paths)
+        self.errors = {}
+
+    @property
+    def ok(self) -> bool:
+        """是否全部加载成功"""
+        return not self.errors
+
+    def raise_for_errors(self) -> None:
+        """若有素材加载失败, 则抛出汇总了所有失败原因的异常
+
+        Raises:
+            `MaterialLoadFailed`: 有素材加载失败
+        """
+        if self.errors:
+            details = "; ".join("%s: %s" % (self.paths[index], error) for index, error in sorted(self.errors.items()))
+            raise exceptions.MaterialLoadFailed("%d 个素材加载失败: %s" % (len(self.errors), details))
+
+    def _dedupe(self) -> None:
+        """使内容id相同的素材成为同一对象"""
+        seen: Dict[str, Union[VideoMaterial, AudioMaterial]] = {}
+        for index, material in enumerate(self.materials):
+            if material is not None:
+                self.materials[index] = seen.setdefault(material.material_id, material)
+
+def load_materials(paths: Sequence[str], kind: Literal["video", "audio"] = "video", *,
+                   workers: int = 8, id_mode: Material_id_mode = "name") -> MaterialBatch:
+    """并发加载多个本地素材, 各素材的加载错误被分别记录而不直接抛出
+
+    素材信息的读取主要耗时于文件I/O及mediainfo库的调用, 期间不占用GIL, 故使用线程池并发进行.
+
+    Args:
+        paths (`Sequence[str]`): 素材文件路径列表, 可以包含重复路径
+        kind (`str`, optional): 素材种类, `video`表示视频或图片素材(`VideoMaterial`), `audio`表示音频素材(`AudioMaterial`). 默认为`video`.
+        workers (`int`, optional): 并发线程数. 默认为8.
+        id_mode (`str`, optional): 素材id的生成方式, 参见`VideoMaterial`. 为`content`时内容相同的素材在结果中为同一对象.
+
+    Returns:
+        `MaterialBatch`: 按传入顺序排列的加载结果, 可调用其`raise_for_errors`方法在有素材加载失败时抛出异常
+    """
+    if workers < 1:
+        raise ValueError("workers 至少为1")
+    material_cls = VideoMaterial if kind == "video" else AudioMaterial
+    batch = MaterialBatch(list(paths))
+
+    def load_one(index: int) -> None:
+        try:
+            batch.materials[index] = material_cls(batch.paths[index], id_mode=id_mode)
+        except Exception as e:
+            batch.errors[index] = e
+
+    if workers == 1 or len(batch.paths) <= 1:
+        for index in range(len(batch.paths)):
+            load_one(index)
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(batch.paths))) as executor:
+            list(executor.map(load_one, range(len(batch.paths))))
+
+    if id_mode == "content":
+        batch._dedupe()
+    return batch
+
+async def aload_materials(paths: Sequence[str], kind: Literal["video", "audio"] = "video", *,
+                          id_mode: Material_id_mode = "name") -> MaterialBatch:
+    """`load_materials`的异步版本, 在线程池中并发读取素材, 同时进行的读取数量由`async_io.configure`设置
+
+    Args:
+        paths (`Sequence[str]`): 素材文件路径列表, 可以包含重复路径
+        kind (`str`, optional): 素材种类, 参见`load_materials`. 默认为`video`.
+        id_mode (`str`, optional): 素材id的生成方式, 参见`load_materials`.
+
+    Returns:
+        `MaterialBatch`: 按传入顺序排列的加载结果
+    """
+    material_cls = VideoMaterial if kind == "video" else AudioMaterial
+    batch = MaterialBatch(list(paths))
+
+    async def load_one(index: int) -> None:
+        try:
+            batch.materials[index] = await material_cls.aload(batch.paths[index], id_mode=id_mode)
+        except Exception as e:
+            batch.errors[index] = e
+
+    await asyncio.gather(*(load_one(index) for index in range(len(batch.paths))))
+    if id_mode == "content":
+        batch._dedupe()
+    return batch
@@ -0,0 +1,442 @@
+"""直接读取常见媒体文件头部的轻量解析器, 作为mediainfo的快速路径
+
+各函数在无法处理给定文件时返回None, 此时由调用者回退到mediainfo
+"""
+
+import struct
+
+from typing import Optional, Tuple, BinaryIO, Iterator
+
+Video_info = Tuple[int, int, int]
+"""`(时长, 宽度, 高度)`, 时长单位为微秒"""
+
+_MAX_MOOV_SIZE = 64 << 20
+"""moov盒子的大小上限, 超出时不再尝试解析"""
+
+_TOP_LEVEL_BOXES = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pnot", b"uuid", b"meta"}
+
+def _read_box_header(f: BinaryIO) -> Optional[Tuple[bytes, int, int]]:
+    """读取文件中的盒子头, 返回`(类型, 头部长度, 盒子总长度)`, 总长度为0表示延伸至文件末尾"""
+    header = f.read(8)
+    if len(header) < 8:
+        return None
+    size, box_type = struct.unpack(">I4s", header)
+    if size == 1:
+        large = f.read(8)
+        if len(large) < 8:
+            return None
+        return box_type, 16, struct.unpack(">Q", large)[0]
+    return box_type, 8, size
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[bytes, int, int]]:
+    """遍历内存中的一系列盒子, 产生`(类型, 内容起始位置, 内容结束位置)`"""
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+def _find_box(data: bytes, start: int, end: int, box_type: bytes) -> Optional[Tuple[int, int]]:
+    for t, s, e in _iter_boxes(data, start, end):
+        if t == box_type:
+            return s, e
+    return None
+
+def _find_path(data: bytes, start: int, end: int, *path: bytes) -> Optional[Tuple[int, int]]:
+    span: Optional[Tuple[int, int]] = (start, end)
+    for box_type in path:
+        span = _find_box(data, span[0], span[1], box_type)  # type: ignore
+        if span is None:
+            return None
+    return span
+
+def _read_moov(f: BinaryIO) -> Optional[bytes]:
+    """在文件顶层盒子间跳转, 读取moov盒子的内容, 也支持moov位于文件末尾的情形"""
+    f.seek(0, 2)
+    file_size = f.tell()
+    pos = 0
+    first = True
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        header = _read_box_header(f)
+        if header is None:
+            return None
+        box_type, header_size, size = header
+        if first and box_type not in _TOP_LEVEL_BOXES:
+            return None  # 不是ISO-BMFF文件
+        first = False
+        if size == 0:
+            size = file_size - pos
+        if size < header_size:
+            return None
+        if box_type == b"moov":
+            if size > _MAX_MOOV_SIZE:
+                return None
+            data = f.read(size - header_size)
+            return data if len(data) == size - header_size else None
+        pos += size
+    return None
+
+def _mdhd_duration(data: bytes, start: int) -> Optional[Tuple[int, int]]:
+    """解析mdhd或mvhd盒子, 返回`(timescale, duration)`"""
+    version = data[start]
+    if version == 1:
+        timescale, duration = struct.unpack_from(">IQ", data, start + 20)
+    else:
+        timescale, duration = struct.unpack_from(">II", data, start + 12)
+    if timescale == 0:
+        return None
+    return timescale, duration
+
+def read_mp4(f: BinaryIO) -> Optional[Video_info]:
+    """解析MP4/MOV(ISO-BMFF)文件, 获取其第一条视频轨道的时长及尺寸
+
+    仅读取各顶层盒子的头部以及moov盒子本身. 分片MP4等无法确定时长的文件返回None
+    """
+    moov = _read_moov(f)
+    if moov is None:
+        return None
+    if _find_box(moov, 0, len(moov), b"mvex") is not None:
+        return None  # 分片MP4的时长记录在各个moof中
+
+    for box_type, start, end in _iter_boxes(moov):
+        if box_type != b"trak":
+            continue
+        mdia = _find_box(moov, start, end, b"mdia")
+        if mdia is None:
+            continue
+        hdlr = _find_box(moov, mdia[0], mdia[1], b"hdlr")
+        if hdlr is None or moov[hdlr[0] + 8:hdlr[0] + 12] != b"vide":
+            continue
+
+        mdhd = _find_box(moov, mdia[0], mdia[1], b"mdhd")
+        if mdhd is None:
+            return None
+        scaled = _mdhd_duration(moov, mdhd[0])
+        if scaled is None or scaled[1] == 0 or scaled[1] == 0xFFFFFFFF:
+            return None
+        duration = int(scaled[1] * 1000000 // scaled[0])
+
+        # 优先使用采样描述中的编码尺寸, 与mediainfo报告的宽高一致
+        stsd = _find_path(moov, mdia[0], mdia[1], b"minf", b"stbl", b"stsd")
+        if stsd is not None and stsd[1] - stsd[0] >= 8 + 8 + 28:
+            entry = stsd[0] + 8  # 跳过version/flags及entry_count
+            width, height = struct.unpack_from(">HH", moov, entry + 8 + 24)
+        else:
+            tkhd = _find_box(moov, start, end, b"tkhd")
+            if tkhd is None:
+                return None
+            offset = tkhd[0] + (88 if moov[tkhd[0]] == 1 else 76)
+            if offset + 8 > tkhd[1]:
+                return None
+            width, height = (v >> 16 for v in struct.unpack_from(">II", moov, offset))
+        if width == 0 or height == 0:
+            return None
+        return duration, width, height
+
+    return None
+
+def read_video_header(path: str) -> Optional[Video_info]:
+    """尝试不借助mediainfo获取视频文件的时长及尺寸, 无法处理时返回None"""
+    try:
+        with open(path, "rb") as f:
+            return read_mp4(f)
+    except (OSError, struct.error, IndexError):
+        return None
+
+def _read_mp4_audio(f: BinaryIO) -> Optional[int]:
+    """解析M4A等ISO-BMFF文件, 获取其第一条音频轨道的时长, 含有视频轨道的文件返回None"""
+    moov = _read_moov(f)
+    if moov is None or _find_box(moov, 0, len(moov), b"mvex") is not None:
+        return None
+
+    duration: Optional[int] = None
+    for box_type, start, end in _iter_boxes(moov):
+        if box_type != b"trak":
+            continue
+        mdia = _find_box(moov, start, end, b"mdia")
+        hdlr = _find_box(moov, mdia[0], mdia[1], b"hdlr") if mdia is not None else None
+        if mdia is None or hdlr is None:
+            continue
+        handler = moov[hdlr[0] + 8:hdlr[0] + 12]
+        if handler == b"vide":
+            return None  # 交由mediainfo报告错误
+        if handler != b"soun" or duration is not None:
+            continue
+
+        mdhd = _find_box(moov, mdia[0], mdia[1], b"mdhd")
+        scaled = _mdhd_duration(moov, mdhd[0]) if mdhd is not None else None
+        if scaled is None or scaled[1] == 0 or scaled[1] == 0xFFFFFFFF:
+            return None
+        duration = int(scaled[1] * 1000000 // scaled[0])
+    return duration
+
+def _read_wav(f: BinaryIO) -> Optional[int]:
+    """根据RIFF/WAVE文件的fmt及data块计算时长"""
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+    f.seek(0, 2)
+    file_size = f.tell()
+
+    byte_rate: Optional[int] = None
+    pos = 12
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        chunk_id, chunk_size = struct.unpack("<4sI", f.read(8))
+        if chunk_id == b"fmt ":
+            fmt = f.read(16)
+            if len(fmt) < 16:
+                return None
+            byte_rate = struct.unpack_from("<I", fmt, 8)[0]
+        elif chunk_id == b"data":
+            if not byte_rate or chunk_size == 0xFFFFFFFF:
+                return None
+            data_size = min(chunk_size, file_size - pos - 8)  # 容忍被截断的文件
+            return int(data_size * 1000000 // byte_rate)
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+_MP3_BITRATES = {
+    # (MPEG-1, Layer III)及(MPEG-2/2.5, Layer III)的比特率表, 单位为kbps
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0],
+}
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000],   # MPEG-2.5
+}
+
+def _parse_mp3_frame_header(header: bytes) -> Optional[Tuple[int, int, int, int, bool]]:
+    """解析MPEG音频帧头, 返回`(帧长, 比特率(bps), 采样率, 每帧采样数, 是否为单声道)`, 仅支持Layer III"""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version_bits = (header[1] >> 3) & 0x3
+    layer_bits = (header[1] >> 1) & 0x3
+    if version_bits == 1 or layer_bits != 1:
+        return None
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x3
+    if sample_rate_index == 3:
+        return None
+    bitrate = _MP3_BITRATES[1 if version_bits == 3 else 2][bitrate_index] * 1000
+    if bitrate == 0:
+        return None
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+    padding = (header[2] >> 1) & 0x1
+    samples = 1152 if version_bits == 3 else 576
+    frame_length = samples // 8 * bitrate // sample_rate + padding
+    return frame_length, bitrate, sample_rate, samples, (header[3] >> 6) == 3
+
+def _read_mp3(f: BinaryIO) -> Optional[int]:
+    """根据MP3文件的Xing/Info或VBRI头计算时长, 二者皆无时视为固定比特率文件"""
+    f.seek(0, 2)
+    file_size = f.tell()
+    f.seek(0)
+    head = f.read(10)
+    start = 0
+    if head[:3] == b"ID3" and len(head) == 10:
+        tag_size = (head[6] & 0x7F) << 21 | (head[7] & 0x7F) << 14 | (head[8] & 0x7F) << 7 | (head[9] & 0x7F)
+        start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+
+    # 在标签后的一小段范围内寻找第一个有效帧, 并以下一帧的帧头加以确认
+    f.seek(start)
+    buf = f.read(64 * 1024)
+    frame: Optional[Tuple[int, int, int, int, bool]] = None
+    offset = 0
+    while True:
+        offset = buf.find(b"\xFF", offset)
+        if offset < 0 or offset + 4 > len(buf):
+            return None
+        frame = _parse_mp3_frame_header(buf[offset:offset + 4])
+        if frame is not None:
+            following = buf[offset + frame[0]:offset + frame[0] + 4]
+            if len(following) < 4 or _parse_mp3_frame_header(following) is not None:
+                break
+        offset += 1
+    frame_length, bitrate, sample_rate, samples, mono = frame
+    frame_data = buf[offset:offset + frame_length]
+
+    # Xing/Info头位于side information之后
+    side_info = (17 if mono else 32) if samples == 1152 else (9 if mono else 17)
+    xing = frame_data[4 + side_info:4 + side_info + 12]
+    if xing[:4] in (b"Xing", b"Info") and len(xing) == 12:
+        flags = struct.unpack_from(">I", xing, 4)[0]
+        if flags & 0x1:
+            frames = struct.unpack_from(">I", xing, 8)[0]
+            return int(frames * samples * 1000000 // sample_rate)
+    vbri = frame_data[36:36 + 18]
+    if vbri[:4] == b"VBRI" and len(vbri) == 18:
+        frames = struct.unpack_from(">I", vbri, 14)[0]
+        return int(frames * samples * 1000000 // sample_rate)
+
+    audio_size = file_size - (start + offset)
+    f.seek(max(file_size - 128, 0))
+    if f.read(3) == b"TAG":
+        audio_size -= 128
+    return int(audio_size * 8 * 1000000 // bitrate)
+
+def read_audio_header(path: str) -> Optional[int]:
+    """尝试不借助mediainfo获取WAV/MP3/M4A音频文件的时长(微秒), 无法处理时返回None"""
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(12)
+            f.seek(0)
+            if magic[:4] == b"RIFF":
+                return _read_wav(f)
+            if magic[:3] == b"ID3" or (len(magic) >= 2 and magic[0] == 0xFF and magic[1] & 0xE0 == 0xE0):
+                return _read_mp3(f)
+            if magic[4:8] in _TOP_LEVEL_BOXES:
+                return _read_mp4_audio(f)
+            return None
+    except (OSError, struct.error, IndexError):
+        return None
+
+Image_info = Tuple[Optional[int], int, int]
+"""`(时长, 宽度, 高度)`, 静态图片的时长为None, 动图的时长单位为微秒"""
+
+_GIF_DEFAULT_DELAY = 10
+"""帧延迟为0或1(单位为1/100秒)时采用的延迟, 与浏览器的处理一致"""
+
+def _read_png(data: bytes) -> Optional[Image_info]:
+    if len(data) < 24 or data[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack_from(">II", data, 16)
+    return None, width, height
+
+def _read_jpeg(f: BinaryIO) -> Optional[Image_info]:
+    """依次跳过各个段, 直至找到SOFn段"""
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        while code == 0xFF:  # 填充字节
+            code = f.read(1)[0]
+        if code == 0xD8 or code == 0x01 or 0xD0 <= code <= 0xD7:
+            continue  # 无长度字段的标记
+        if code == 0xD9 or code == 0xDA:
+            return None  # 在图像数据之前未找到SOFn
+        length = struct.unpack(">H", f.read(2))[0]
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            segment = f.read(5)
+            if len(segment) < 5:
+                return None
+            height, width = struct.unpack_from(">HH", segment, 1)
+            return None, width, height
+        f.seek(length - 2, 1)
+
+def _read_webp(data: bytes) -> Optional[Image_info]:
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30 and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack_from("<HH", data, 26)
+        return None, width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25 and data[20] == 0x2F:
+        bits = struct.unpack_from("<I", data, 21)[0]
+        return None, (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return None, width, height
+    return None
+
+def _read_bmp(data: bytes) -> Optional[Image_info]:
+    if len(data) < 26:
+        return None
+    header_size = struct.unpack_from("<I", data, 14)[0]
+    if header_size == 12:
+        width, height = struct.unpack_from("<HH", data, 18)
+    else:
+        width, height = struct.unpack_from("<ii", data, 18)
+    return None, abs(width), abs(height)
+
+def _read_gif(f: BinaryIO) -> Optional[Image_info]:
+    """遍历GIF文件的各个块, 累加图形控制扩展中的帧延迟, 不解码图像数据. 逐块读取并跳过图像数据, 不将整个文件读入内存"""
+    header = f.read(13)
+    if len(header) < 13:
+        return None
+    width, height, packed = struct.unpack_from("<HHB", header, 6)
+    if packed & 0x80:
+        f.seek(3 << ((packed & 0x07) + 1), 1)  # 全局颜色表
+
+    def skip_sub_blocks() -> bool:
+        """跳过各数据子块直至块终结符, 文件不完整时返回False"""
+        while True:
+            size = f.read(1)
+            if not size:
+                return False
+            if size[0] == 0:
+                return True
+            f.seek(size[0], 1)
+
+    total_delay = 0
+    frames = 0
+    delay: Optional[int] = None
+    while True:
+        block = f.read(1)
+        if not block or block == b"\x3B":  # 文件结束
+            break
+        elif block == b"\x21":  # 扩展块
+            ext = f.read(2)  # 标签及首个子块的大小
+            if len(ext) < 2:
+                return None
+            label, size = ext
+            first = f.read(size)
+            if len(first) < size:
+                return None
+            if label == 0xF9 and size >= 4:
+                delay = struct.unpack_from("<H", first, 1)[0]
+            if size and not skip_sub_blocks():
+                return None
+        elif block == b"\x2C":  # 图像描述符
+            image_packed = f.read(9)[8]
+            if image_packed & 0x80:
+                f.seek(3 << ((image_packed & 0x07) + 1), 1)  # 局部颜色表
+            f.read(1)  # LZW最小码长
+            if not skip_sub_blocks():  # 图像数据
+                return None
+            frames += 1
+            total_delay += delay if delay is not None and delay > 1 else _GIF_DEFAULT_DELAY
+            delay = None
+        else:
+            return None
+
+    if frames == 0:
+        return None
+    return total_delay * 10000, width, height
+
+def read_image_header(path: str) -> Optional[Image_info]:
+    """尝试不借助mediainfo获取PNG/JPEG/WebP/BMP图片的尺寸, 以及GIF动图的尺寸与时长, 无法处理时返回None
+
+    GIF文件总是被视为动图, 其时长为各帧延迟之和
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(32)
+            if head[:8] == b"\x89PNG\r\n\x1a\n":
+                return _read_png(head)
+            if head[:3] == b"\xFF\xD8\xFF":
+                return _read_jpeg(f)
+            if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+                return _read_webp(head)
+            if head[:2] == b"BM":
+                return _read_bmp(head)
+            if head[:6] in (b"GIF87a", b"GIF89a"):
+                f.seek(0)
+                return _read_gif(f)
+            return None
+    except (OSError, struct.error, IndexError):
+        return None
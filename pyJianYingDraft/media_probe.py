@@ -0,0 +1,343 @@
+"""读取本地媒体文件的时长、尺寸等信息, 并缓存读取结果
+
+缓存以`(绝对路径, 文件大小, st_mtime_ns)`标识一个文件, 文件发生变化后自动失效. 基于文件内容的素材id(参见`content_id`)也一并缓存.
+由素材内容分析得到的其它数据(如场景切换点)以内容id为键保存在同一数据库中, 参见`get_derived`及`put_derived`.
+进程内使用LRU缓存; 通过`configure`指定缓存目录后, 读取结果还会保存在该目录下的SQLite数据库中, 供后续运行及其它进程使用
+"""
+
+import os
+import mmap
+import shutil
+import hashlib
+import sqlite3
+import tempfile
+import threading
+import subprocess
+
+from typing import Optional, Literal, Iterator, Sequence, Tuple
+
+import pymediainfo
+
+from . import media_headers
+from .cache_util import LruCache, prepare_cache_dir
+
+Probe_kind = Literal["video", "audio"]
+"""读取方式: 作为视频(或图片)素材, 或作为音频素材"""
+
+class ProbeResult:
+    """一个媒体文件的读取结果"""
+
+    material_type: Literal["video", "photo", "audio"]
+    """素材类型"""
+    duration: int
+    """素材时长, 单位为微秒"""
+    width: int
+    """素材宽度, 音频素材为0"""
+    height: int
+    """素材高度, 音频素材为0"""
+
+    def __init__(self, material_type: Literal["video", "photo", "audio"], duration: int, width: int = 0, height: int = 0):
+        self.material_type = material_type
+        self.duration = duration
+        self.width = width
+        self.height = height
+
+    def __repr__(self) -> str:
+        return "ProbeResult(%s, duration=%d, %dx%d)" % (self.material_type, self.duration, self.width, self.height)
+
+PHOTO_DURATION = 10800000000
+"""图片素材的时长, 相当于3h"""
+
+def _probe_video_mediainfo(path: str) -> ProbeResult:
+    postfix = os.path.splitext(path)[1]
+    if not pymediainfo.MediaInfo.can_parse():
+        raise ValueError(f"不支持的视频素材类型 '{postfix}'")
+
+    info: pymediainfo.MediaInfo = \
+        pymediainfo.MediaInfo.parse(path, mediainfo_options={"File_TestContinuousFileNames": "0"})  # type: ignore
+    # 有视频轨道的视为视频素材
+    if len(info.video_tracks):
+        return ProbeResult("video", int(info.video_tracks[0].duration * 1e3),  # type: ignore
+                           info.video_tracks[0].width, info.video_tracks[0].height)  # type: ignore
+    # gif文件使用imageio库获取长度
+    elif postfix.lower() == ".gif":
+        import imageio
+        gif = imageio.get_reader(path)
+        duration = int(round(gif.get_meta_data()['duration'] * gif.get_length() * 1e3))
+        gif.close()
+        return ProbeResult("video", duration, info.image_tracks[0].width, info.image_tracks[0].height)  # type: ignore
+    elif len(info.image_tracks):
+        return ProbeResult("photo", PHOTO_DURATION, info.image_tracks[0].width, info.image_tracks[0].height)  # type: ignore
+    else:
+        raise ValueError(f"输入的素材文件 {path} 没有视频轨道或图片轨道")
+
+def _probe_video(path: str) -> ProbeResult:
+    """读取视频或图片素材的信息, 能直接解析文件头时不调用mediainfo"""
+    header = media_headers.read_video_header(path)
+    if header is not None:
+        return ProbeResult("video", *header)
+    image = media_headers.read_image_header(path)
+    if image is not None:
+        duration, width, height = image
+        if duration is None:
+            return ProbeResult("photo", PHOTO_DURATION, width, height)
+        return ProbeResult("video", duration, width, height)
+    return _probe_video_mediainfo(path)
+
+def _probe_audio_mediainfo(path: str) -> ProbeResult:
+    if not pymediainfo.MediaInfo.can_parse():
+        raise ValueError("不支持的音频素材类型 %s" % os.path.splitext(path)[1])
+    info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
+    if len(info.video_tracks):
+        raise ValueError("音频素材不应包含视频轨道")
+    if not len(info.audio_tracks):
+        raise ValueError(f"给定的素材文件 {path} 没有音频轨道")
+    return ProbeResult("audio", int(info.audio_tracks[0].duration * 1e3))  # type: ignore
+
+def _probe_audio(path: str) -> ProbeResult:
+    """读取音频素材的信息, 能直接解析文件头时不调用mediainfo"""
+    duration = media_headers.read_audio_header(path)
+    if duration is not None:
+        return ProbeResult("audio", duration)
+    return _probe_audio_mediainfo(path)
+
+Cache_key = Tuple[str, Probe_kind]
+
+_CACHE_DIR: Optional[str] = None
+_DB_NAME = "media_probe.sqlite3"
+
+_entries: "LruCache[Cache_key, Tuple[int, int, ProbeResult]]" = LruCache(4096)
+"""进程内缓存, 值为`(文件大小, st_mtime_ns, 读取结果)`"""
+_content_ids: "LruCache[str, Tuple[int, int, str]]" = LruCache(4096)
+"""进程内的内容id缓存, 以绝对路径为键, 值为`(文件大小, st_mtime_ns, 内容id)`"""
+_local = threading.local()
+
+def configure(*, max_entries: Optional[int] = None, cache_dir: Optional[str] = "") -> None:
+    """设置素材读取缓存
+
+    Args:
+        max_entries (`int`, optional): 进程内最多缓存的文件数, 超出时淘汰最久未使用者; 为0时禁用进程内缓存. 不指定则保持不变, 初始为4096.
+        cache_dir (`str`, optional): 持久化缓存所在的目录, 为None时禁用持久化缓存. 不指定则保持不变, 初始为禁用.
+    """
+    global _CACHE_DIR
+    if max_entries is not None:
+        _entries.resize(max_entries)
+        _content_ids.resize(max_entries)
+    if cache_dir != "":
+        _CACHE_DIR = prepare_cache_dir(cache_dir)
+
+def clear() -> None:
+    """清空进程内缓存, 持久化缓存不受影响"""
+    _entries.clear()
+    _content_ids.clear()
+
+def _connect() -> Optional[sqlite3.Connection]:
+    """获取当前线程所用的数据库连接, 未启用持久化缓存时返回None"""
+    if _CACHE_DIR is None:
+        return None
+    db_path = os.path.join(_CACHE_DIR, _DB_NAME)
+    conn: Optional[sqlite3.Connection] = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "db_path", None) == db_path:
+        return conn
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS probe (
+                        path TEXT NOT NULL, kind TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,
+                        material_type TEXT NOT NULL, duration INTEGER NOT NULL, width INTEGER NOT NULL, height INTEGER NOT NULL,
+                        PRIMARY KEY (path, kind))""")
+    conn.execute("""CREATE TABLE IF NOT EXISTS derived (
+                        digest TEXT NOT NULL, name TEXT NOT NULL, data BLOB NOT NULL, PRIMARY KEY (digest, name))""")
+    conn.execute("""CREATE TABLE IF NOT EXISTS content_id (
+                        path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, digest TEXT NOT NULL)""")
+    conn.commit()
+    _local.conn, _local.db_path = conn, db_path
+    return conn
+
+def _db_get(key: Cache_key, size: int, mtime_ns: int) -> Optional[ProbeResult]:
+    try:
+        conn = _connect()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT size, mtime_ns, material_type, duration, width, height FROM probe WHERE path=? AND kind=?",
+                           key).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None or row[0] != size or row[1] != mtime_ns:
+        return None
+    return ProbeResult(row[2], row[3], row[4], row[5])
+
+def _db_put(key: Cache_key, size: int, mtime_ns: int, result: ProbeResult) -> None:
+    try:
+        conn = _connect()
+        if conn is None:
+            return
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO probe VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (key[0], key[1], size, mtime_ns, result.material_type, result.duration, result.width, result.height))
+    except sqlite3.Error:
+        pass  # 缓存写入失败不影响读取结果
+
+def probe(path: str, kind: Probe_kind) -> ProbeResult:
+    """读取媒体文件的信息, 优先使用缓存
+
+    Args:
+        path (`str`): 文件的绝对路径
+        kind (`Probe_kind`): 作为视频(或图片)素材还是音频素材读取
+
+    Raises:
+        `FileNotFoundError`: 文件不存在
+        `ValueError`: 不支持的素材文件类型, 此类结果不会被缓存
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"找不到 {path}")
+    key: Cache_key = (path, kind)
+    size, mtime_ns = stat.st_size, stat.st_mtime_ns
+
+    entry = _entries.get(key)
+    if entry is not None and entry[0] == size and entry[1] == mtime_ns:
+        return entry[2]
+
+    result = _db_get(key, size, mtime_ns)
+    if result is None:
+        result = _probe_video(path) if kind == "video" else _probe_audio(path)
+        _db_put(key, size, mtime_ns, result)
+    _entries.put(key, (size, mtime_ns, result))
+    return result
+
+_SAMPLE_SIZE = 64 * 1024
+"""内容id采样时每块的大小"""
+
+def _sampled_digest(path: str, size: int) -> str:
+    """以文件大小及开头、中间、结尾各一块数据计算摘要, 小文件则使用全部内容"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(size.to_bytes(8, "little"))
+    if size == 0:
+        return h.hexdigest()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if size <= 3 * _SAMPLE_SIZE:
+            h.update(mm[:])
+        else:
+            middle = (size - _SAMPLE_SIZE) // 2
+            for offset in (0, middle, size - _SAMPLE_SIZE):
+                h.update(mm[offset:offset + _SAMPLE_SIZE])
+    return h.hexdigest()
+
+def content_id(path: str) -> str:
+    """根据文件内容计算素材id, 相同内容的文件(无论路径及文件名)得到相同的id, 优先使用缓存
+
+    为了速度, 仅对文件大小及开头、中间、结尾各64KB的内容取摘要, 故不保证能区分仅在其它部分有差异的文件
+
+    Args:
+        path (`str`): 文件的绝对路径
+
+    Returns:
+        `str`: 32位十六进制字符串, 与`uuid.hex`形式相同
+
+    Raises:
+        `FileNotFoundError`: 文件不存在
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"找不到 {path}")
+    size, mtime_ns = stat.st_size, stat.st_mtime_ns
+
+    entry = _content_ids.get(path)
+    if entry is not None and entry[0] == size and entry[1] == mtime_ns:
+        return entry[2]
+
+    digest: Optional[str] = None
+    try:
+        conn = _connect()
+        if conn is not None:
+            row = conn.execute("SELECT size, mtime_ns, digest FROM content_id WHERE path=?", (path,)).fetchone()
+            if row is not None and row[0] == size and row[1] == mtime_ns:
+                digest = row[2]
+    except sqlite3.Error:
+        pass
+
+    if digest is None:
+        digest = _sampled_digest(path, size)
+        try:
+            conn = _connect()
+            if conn is not None:
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO content_id VALUES (?, ?, ?, ?)", (path, size, mtime_ns, digest))
+        except sqlite3.Error:
+            pass
+
+    _content_ids.put(path, (size, mtime_ns, digest))
+    return digest
+
+def get_derived(digest: str, name: str) -> Optional[bytes]:
+    """从持久化缓存中读取由素材内容分析得到的数据, 未启用持久化缓存或没有记录时返回None
+
+    Args:
+        digest (`str`): 素材的内容id, 参见`content_id`
+        name (`str`): 数据的名称, 应包含影响分析结果的参数
+    """
+    try:
+        conn = _connect()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT data FROM derived WHERE digest=? AND name=?", (digest, name)).fetchone()
+    except sqlite3.Error:
+        return None
+    return None if row is None else bytes(row[0])
+
+def put_derived(digest: str, name: str, data: bytes) -> None:
+    """将由素材内容分析得到的数据写入持久化缓存, 未启用持久化缓存时不做任何事, 参见`get_derived`"""
+    try:
+        conn = _connect()
+        if conn is None:
+            return
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO derived VALUES (?, ?, ?)", (digest, name, data))
+    except sqlite3.Error:
+        pass
+
+def ffmpeg_exe() -> Optional[str]:
+    """获取用于解码素材的ffmpeg可执行文件, 优先使用`imageio_ffmpeg`附带者, 其次为PATH中者, 均不存在时返回None"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except (ImportError, RuntimeError):
+        return shutil.which("ffmpeg")
+
+def stream_ffmpeg(exe: str, path: str, output_args: Sequence[str], chunk_size: int) -> Iterator[bytes]:
+    """以ffmpeg解码文件, 逐块产生其写到标准输出的原始数据, 除最后一块外每块均为`chunk_size`字节
+
+    ffmpeg的错误输出写入临时文件而非管道, 以免其写满管道缓冲区后与读取标准输出的本进程相互等待.
+    提前停止迭代时ffmpeg进程会被终止
+
+    Args:
+        exe (`str`): ffmpeg可执行文件, 参见`ffmpeg_exe`
+        path (`str`): 要解码的文件路径
+        output_args (`Sequence[str]`): 输出选项, 如过滤器及输出格式
+        chunk_size (`int`): 每块的字节数
+
+    Raises:
+        `ValueError`: 解码失败
+    """
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen([exe, "-v", "error", "-i", path, *output_args, "-"],
+                                stdout=subprocess.PIPE, stderr=stderr)
+        finished = False
+        try:
+            while True:
+                data = proc.stdout.read(chunk_size)  # type: ignore
+                if not data:
+                    break
+                yield data
+            finished = True
+        finally:
+            proc.stdout.close()  # type: ignore
+            if not finished:
+                proc.kill()
+            returncode = proc.wait()
+        if returncode != 0:
+            stderr.seek(0)
+            raise ValueError("ffmpeg解码 %s 失败: %s" % (path, stderr.read().decode("utf-8", "replace").strip()))
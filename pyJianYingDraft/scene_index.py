@@ -0,0 +1,134 @@
+"""视频素材的场景切换点索引, 用于自动选取从镜头边界开始的素材片段, 需要安装NumPy
+
+以固定帧率经由ffmpeg抽取缩小后的灰度帧, 以NumPy批量计算各帧的灰度直方图, 相邻帧的直方图差异超过阈值处即视为场景切换点.
+索引以文件内容id为键缓存于内存中, 并在启用了素材读取的持久化缓存时一并保存于其中(参见`media_probe.configure`), 故每个素材只需分析一次
+"""
+
+import json
+
+from typing import Optional, Iterator, Tuple
+from typing import List, Any
+
+from . import media_probe
+from .cache_util import LruCache, import_numpy
+from .time_util import Timerange
+from .local_materials import VideoMaterial
+
+SAMPLE_FPS: float = 4.0
+"""默认的抽帧帧率"""
+THRESHOLD: float = 0.35
+"""默认的切换阈值, 即相邻帧的归一化直方图之间的L1距离之半, 取值范围为[0, 1]"""
+
+_FRAME_SIZE = (64, 36)
+"""抽取的帧的尺寸"""
+_BINS = 32
+"""直方图的区间数"""
+_CHUNK_FRAMES = 256
+"""每次处理的帧数"""
+
+_entries: "LruCache[Tuple[str, float, float], List[int]]" = LruCache(1024)
+"""内存中的索引缓存, 以`(内容id, 抽帧帧率, 阈值)`为键"""
+
+def clear() -> None:
+    """清空内存中的索引缓存, 持久化缓存不受影响"""
+    _entries.clear()
+
+def _import_numpy():
+    return import_numpy("分析场景切换")
+
+def _iter_frames(path: str, sample_fps: float) -> Iterator[Any]:
+    """经由ffmpeg以`sample_fps`的帧率抽取灰度帧, 每次产生形如`(帧数, 像素数)`的数组
+
+    Raises:
+        `ValueError`: 未找到ffmpeg或解码失败
+    """
+    np = _import_numpy()
+    exe = media_probe.ffmpeg_exe()
+    if exe is None:
+        raise ValueError("分析场景切换需要ffmpeg, 请安装imageio-ffmpeg或将ffmpeg加入PATH")
+
+    width, height = _FRAME_SIZE
+    frame_bytes = width * height
+    output_args = ["-an", "-vf", "fps=%g,scale=%d:%d,format=gray" % (sample_fps, width, height), "-f", "rawvideo"]
+    for data in media_probe.stream_ffmpeg(exe, path, output_args, frame_bytes * _CHUNK_FRAMES):
+        count = len(data) // frame_bytes
+        if count:
+            yield np.frombuffer(data[:count * frame_bytes], dtype=np.uint8).reshape(count, frame_bytes)
+
+def _detect_cuts(frame_blocks: Iterator[Any], sample_fps: float, threshold: float) -> List[int]:
+    """计算各帧的直方图及相邻帧的差异, 返回差异超过阈值处的时刻, 单位为微秒"""
+    np = _import_numpy()
+    cuts: List[int] = []
+    previous: Optional[Any] = None
+    first_index = 0
+    for frames in frame_blocks:
+        count, pixels = frames.shape
+        # 为每帧的像素值加上各自的偏移后统一计数, 一次得到整块的直方图
+        offsets = (np.arange(count, dtype=np.int64) * _BINS)[:, None]
+        bins = (frames.astype(np.int64) * _BINS >> 8) + offsets
+        hists = np.bincount(bins.ravel(), minlength=count * _BINS).reshape(count, _BINS) / float(pixels)
+        if previous is not None:
+            hists = np.concatenate((previous, hists))
+        diffs = np.abs(np.diff(hists, axis=0)).sum(axis=1) / 2
+        start = first_index if previous is None else first_index - 1
+        for index in np.nonzero(diffs > threshold)[0]:
+            cuts.append(round((start + int(index) + 1) * 1e6 / sample_fps))
+        previous = hists[-1:]
+        first_index += count
+    return cuts
+
+def scene_cuts(path: str, *, sample_fps: float = SAMPLE_FPS, threshold: float = THRESHOLD) -> List[int]:
+    """获取视频文件的场景切换点, 优先使用缓存
+
+    Args:
+        path (`str`): 视频文件路径
+        sample_fps (`float`, optional): 抽帧帧率, 越高则切换点越精确但分析越慢. 默认为`SAMPLE_FPS`.
+        threshold (`float`, optional): 切换阈值, 越低则检测出的切换点越多. 默认为`THRESHOLD`.
+
+    Returns:
+        `List[int]`: 升序排列的各切换点时刻, 单位为微秒, 不含0. 调用者不应修改之
+
+    Raises:
+        `ImportError`: 未安装NumPy
+        `FileNotFoundError`: 文件不存在
+        `ValueError`: 无法解码此文件
+    """
+    if sample_fps <= 0:
+        raise ValueError("sample_fps 必须为正数")
+    digest = media_probe.content_id(path)
+    key = (digest, float(sample_fps), float(threshold))
+    cuts = _entries.get(key)
+    if cuts is not None:
+        return cuts
+
+    name = "scene_cuts:%g:%g" % (sample_fps, threshold)
+    data = media_probe.get_derived(digest, name)
+    if data is not None:
+        cuts = json.loads(data)
+    else:
+        cuts = _detect_cuts(_iter_frames(path, sample_fps), sample_fps, threshold)
+        media_probe.put_derived(digest, name, json.dumps(cuts).encode("utf-8"))
+
+    _entries.put(key, cuts)
+    return cuts
+
+def choose_source_timerange(material: VideoMaterial, duration: int, **kwargs: Any) -> Optional[Timerange]:
+    """为给定时长的片段在视频素材中选取一段从镜头边界开始的素材片段
+
+    选取能完整容纳此时长的最早的镜头(不含素材开头的第一个镜头, 其开头常有过渡画面)的开头; 若没有这样的镜头, 则从素材开头选取.
+
+    Args:
+        material (`VideoMaterial`): 视频素材
+        duration (`int`): 所需的素材片段时长, 单位为微秒
+        **kwargs: 传递给`scene_cuts`的其它参数
+
+    Returns:
+        `Timerange`: 选取的素材片段; 素材为图片或时长不足时返回None
+    """
+    if material.material_type == "photo" or duration > material.duration:
+        return None
+    cuts = [cut for cut in scene_cuts(material.path, **kwargs) if cut < material.duration]
+    for start, end in zip(cuts, cuts[1:] + [material.duration]):
+        if end - start >= duration:
+            return Timerange(start, duration)
+    return Timerange(0, duration)
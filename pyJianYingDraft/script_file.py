@@ -1,15 +1,23 @@
 import os
-import json
 import math
+import itertools
 from copy import deepcopy
+from concurrent.futures import Future
 
 from typing import Optional, Literal, Union, overload
-from typing import Type, Dict, List, Any
+from typing import Type, Dict, List, Tuple, Iterable, Any, MutableMapping
 
 from . import util
 from . import assets
+from . import serializer
+from . import file_io
+from . import async_io
+from . import template_cache
+from . import json_patch
+from . import scene_index
 from . import exceptions
 from .template_mode import ImportedTrack, EditableTrack, ImportedMediaTrack, ImportedTextTrack, ShrinkMode, ExtendMode, import_track
+from .cow_json import CowDict, unwrap
 from .time_util import Timerange, tim, srt_tstamp
 from .local_materials import VideoMaterial, AudioMaterial
 from .segment import BaseSegment, Speed, ClipSettings
@@ -53,6 +61,12 @@ class ScriptMaterial:
     canvases: List[BackgroundFilling]
     """背景填充列表"""
 
+    _ID_ATTRS: Dict[str, str] = {
+        "videos": "material_id", "audios": "material_id", "audio_fades": "fade_id", "audio_effects": "effect_id",
+        "animations": "animation_id", "video_effects": "global_id", "transitions": "global_id", "filters": "global_id"
+    }
+    """各需要判断成员关系的素材列表中, 用作素材id的属性名. 这些列表总以`util.KeyedList`保存"""
+
     def __init__(self):
         self.audios = []
         self.videos = []
@@ -79,39 +93,53 @@ class ScriptMaterial:
 
     def __contains__(self, item) -> bool:
         if isinstance(item, VideoMaterial):
-            return item.material_id in [video.material_id for video in self.videos]
+            return self.videos.has_key(item.material_id)  # type: ignore
         elif isinstance(item, AudioMaterial):
-            return item.material_id in [audio.material_id for audio in self.audios]
+            return self.audios.has_key(item.material_id)  # type: ignore
         elif isinstance(item, AudioFade):
-            return item.fade_id in [fade.fade_id for fade in self.audio_fades]
+            return self.audio_fades.has_key(item.fade_id)  # type: ignore
         elif isinstance(item, AudioEffect):
-            return item.effect_id in [effect.effect_id for effect in self.audio_effects]
+            return self.audio_effects.has_key(item.effect_id)  # type: ignore
         elif isinstance(item, SegmentAnimations):
-            return item.animation_id in [ani.animation_id for ani in self.animations]
+            return self.animations.has_key(item.animation_id)  # type: ignore
         elif isinstance(item, VideoEffect):
-            return item.global_id in [effect.global_id for effect in self.video_effects]
+            return self.video_effects.has_key(item.global_id)  # type: ignore
         elif isinstance(item, Transition):
-            return item.global_id in [transition.global_id for transition in self.transitions]
+            return self.transitions.has_key(item.global_id)  # type: ignore
         elif isinstance(item, Filter):
-            return item.global_id in [filter_.global_id for filter_ in self.filters]
+            return self.filters.has_key(item.global_id)  # type: ignore
         else:
             raise TypeError("Invalid argument type '%s'" % type(item))
 
-    def export_json(self) -> Dict[str, List[Any]]:
+    def __setattr__(self, name: str, value: Any) -> None:
+        # 需要判断成员关系的素材列表被整体替换时, 同样为其建立索引
+        id_attr = self._ID_ATTRS.get(name)
+        if id_attr is not None and not (isinstance(value, util.KeyedList) and value.key_attr == id_attr):
+            value = util.KeyedList(id_attr, value)
+        super().__setattr__(name, value)
+
+    @staticmethod
+    def _export_list(items: List[Any], lazy: bool) -> List[Any]:
+        if lazy:
+            return util.LazyList(len(items), lambda: (item.export_json() for item in items))
+        return [item.export_json() for item in items]
+
+    def export_json(self, *, lazy: bool = False) -> Dict[str, List[Any]]:
+        """导出素材部分的JSON数据, 若`lazy`为真, 则各素材列表均为按需导出的`LazyList`"""
         return {
             "ai_translates": [],
             "audio_balances": [],
-            "audio_effects": [effect.export_json() for effect in self.audio_effects],
-            "audio_fades": [fade.export_json() for fade in self.audio_fades],
+            "audio_effects": self._export_list(self.audio_effects, lazy),
+            "audio_fades": self._export_list(self.audio_fades, lazy),
             "audio_track_indexes": [],
-            "audios": [audio.export_json() for audio in self.audios],
+            "audios": self._export_list(self.audios, lazy),
             "beats": [],
-            "canvases": [canvas.export_json() for canvas in self.canvases],
+            "canvases": self._export_list(self.canvases, lazy),
             "chromas": [],
             "color_curves": [],
             "digital_humans": [],
             "drafts": [],
-            "effects": [_filter.export_json() for _filter in self.filters],
+            "effects": self._export_list(self.filters, lazy),
             "flowers": [],
             "green_screens": [],
             "handwrites": [],
@@ -120,8 +148,8 @@ class ScriptMaterial:
             "log_color_wheels": [],
             "loudnesses": [],
             "manual_deformations": [],
-            "masks": self.masks,
-            "material_animations": [ani.export_json() for ani in self.animations],
+            "masks": list(self.masks),
+            "material_animations": self._export_list(self.animations, lazy),
             "material_colors": [],
             "multi_language_refs": [],
             "placeholders": [],
@@ -132,16 +160,16 @@ class ScriptMaterial:
             "smart_crops": [],
             "smart_relights": [],
             "sound_channel_mappings": [],
-            "speeds": [spd.export_json() for spd in self.speeds],
-            "stickers": self.stickers,
+            "speeds": self._export_list(self.speeds, lazy),
+            "stickers": list(self.stickers),
             "tail_leaders": [],
             "text_templates": [],
-            "texts": self.texts,
+            "texts": list(self.texts),
             "time_marks": [],
-            "transitions": [transition.export_json() for transition in self.transitions],
-            "video_effects": [effect.export_json() for effect in self.video_effects],
+            "transitions": self._export_list(self.transitions, lazy),
+            "video_effects": self._export_list(self.video_effects, lazy),
             "video_trackings": [],
-            "videos": [video.export_json() for video in self.videos],
+            "videos": self._export_list(self.videos, lazy),
             "vocal_beautifys": [],
             "vocal_separations": []
         }
@@ -168,11 +196,21 @@ class ScriptFile:
     tracks: Dict[str, Track]
     """轨道信息"""
 
-    imported_materials: Dict[str, List[Dict[str, Any]]]
-    """导入的素材信息"""
+    imported_materials: MutableMapping[str, List[Dict[str, Any]]]
+    """导入的素材信息, 模板模式下为与模板内容写时复制地共享的`CowDict`"""
     imported_tracks: List[ImportedTrack]
     """导入的轨道信息"""
 
+    _pending_saves: List["Future[bool]"]
+    """通过`save_async`提交但尚未确认完成的保存任务"""
+    _unchecked_segments: List[Union[VideoSegment, AudioSegment]]
+    """素材时长未知, 尚未检查其截取范围的片段, 在导出前完成检查"""
+
+    _patch_source: Optional[bytes]
+    """补丁模式下模板文件的原始内容, 非补丁模式下为None"""
+    _patch_index: Optional[Dict[json_patch.Json_path, json_patch.Span]]
+    """原始内容中各可替换值的位置, 在首次以补丁方式保存时建立"""
+
     def __init__(self, width: int, height: int, fps: int = 30):
         """**创建剪映草稿推荐使用`DraftFolder.create_draft()`而非此方法**
 
@@ -194,15 +232,26 @@ class ScriptFile:
         self.imported_materials = {}
         self.imported_tracks = []
 
-        with open(assets.get_asset_path('DRAFT_CONTENT_TEMPLATE'), "r", encoding="utf-8") as f:
-            self.content = json.load(f)
+        self._pending_saves = []
+        self._unchecked_segments = []
+        self._patch_source = None
+        self._patch_index = None
+
+        self.content = serializer.load_file(str(assets.get_asset_path('DRAFT_CONTENT_TEMPLATE')))
 
     @staticmethod
-    def load_template(json_path: str) -> "ScriptFile":
+    def load_template(json_path: str, *, lazy: bool = False, patch: bool = False) -> "ScriptFile":
         """从JSON文件加载草稿模板
 
         Args:
             json_path (str): JSON文件路径
+            lazy (bool, optional): 是否按需加载, 此时各导入轨道的片段仅在首次访问时才被构造, 未被访问的轨道在导出时原样写回.
+                适合只修改少量片段的大型模板. 导入的素材总是写时复制地与模板内容共享, 不受此选项影响. 默认为否.
+            patch (bool, optional): 是否启用补丁模式. 此时若仅修改了已有素材的字段(如`replace_material_by_name`及`replace_text`),
+                保存时只将发生变化的值写入模板文件原始内容的相应位置, 其余内容原样保留; 若添加了轨道、素材或修改了片段, 则仍完整导出.
+                注意补丁模式不会检测对`content`的直接修改. 默认为否.
+
+        模板文件的解析结果会被缓存, 再次加载未发生变化的同一文件时无需重新解析, 参见`template_cache.configure`.
 
         Raises:
             `FileNotFoundError`: JSON文件不存在
@@ -211,17 +260,25 @@ class ScriptFile:
         obj.save_path = json_path
         if not os.path.exists(json_path):
             raise FileNotFoundError("JSON文件 '%s' 不存在" % json_path)
-        with open(json_path, "r", encoding="utf-8") as f:
-            obj.content = json.load(f)
+        obj.content = template_cache.load(json_path)
 
         util.assign_attr_with_json(obj, ["fps", "duration"], obj.content)
         util.assign_attr_with_json(obj, ["width", "height"], obj.content["canvas_config"])
 
-        obj.imported_materials = deepcopy(obj.content["materials"])
-        obj.imported_tracks = [import_track(track_data) for track_data in obj.content["tracks"]]
+        obj.imported_materials = CowDict(obj.content["materials"])
+        obj.imported_tracks = [import_track(track_data, lazy=lazy) for track_data in obj.content["tracks"]]
+
+        if patch:
+            with open(json_path, "rb") as f:
+                obj._patch_source = f.read()
 
         return obj
 
+    @staticmethod
+    async def aload_template(json_path: str, *, lazy: bool = False, patch: bool = False) -> "ScriptFile":
+        """`load_template`的异步版本, 在线程池中读取并解析模板, 参数与其相同. 参见`async_io.configure`"""
+        return await async_io.run_blocking(ScriptFile.load_template, json_path, lazy=lazy, patch=patch)
+
     def add_material(self, material: Union[VideoMaterial, AudioMaterial]) -> "ScriptFile":
         """向草稿文件中添加一个素材"""
         if material in self.materials:  # 素材已存在
@@ -295,66 +352,96 @@ class ScriptFile:
             `TypeError`: 片段类型不匹配轨道类型
             `SegmentOverlap`: 新片段与已有片段重叠
         """
-        target = self._get_track(type(segment), track_name)
+        return self.add_segments((segment,), track_name)
 
-        # 加入轨道并更新时长
-        target.add_segment(segment)
-        self.duration = max(self.duration, segment.end)
+    def add_segments(self, segments: Iterable[Union[VideoSegment, StickerSegment, AudioSegment, TextSegment]],
+                     track_name: Optional[str] = None) -> "ScriptFile":
+        """向指定轨道中批量添加多个同类型的片段, 效果与逐个调用`add_segment`相同, 但总耗时与片段数量成线性关系
 
-        # 自动添加相关素材
-        if isinstance(segment, VideoSegment):
-            # 出入场等动画
-            if (segment.animations_instance is not None) and (segment.animations_instance not in self.materials):
-                self.materials.animations.append(segment.animations_instance)
-            # 特效
-            for effect in segment.effects:
-                if effect not in self.materials:
-                    self.materials.video_effects.append(effect)
-            # 滤镜
-            for filter_ in segment.filters:
-                if filter_ not in self.materials:
-                    self.materials.filters.append(filter_)
-            # 蒙版
-            if segment.mask is not None:
-                self.materials.masks.append(segment.mask.export_json())
-            # 转场
-            if (segment.transition is not None) and (segment.transition not in self.materials):
-                self.materials.transitions.append(segment.transition)
-            # 背景填充
-            if segment.background_filling is not None:
-                self.materials.canvases.append(segment.background_filling)
-
-            self.materials.speeds.append(segment.speed)
-        elif isinstance(segment, StickerSegment):
-            self.materials.stickers.append(segment.export_material())
-        elif isinstance(segment, AudioSegment):
-            # 淡入淡出
-            if (segment.fade is not None) and (segment.fade not in self.materials):
-                self.materials.audio_fades.append(segment.fade)
-            # 特效
-            for effect in segment.effects:
-                if effect not in self.materials:
-                    self.materials.audio_effects.append(effect)
-            self.materials.speeds.append(segment.speed)
-        elif isinstance(segment, TextSegment):
-            # 出入场等动画
-            if (segment.animations_instance is not None) and (segment.animations_instance not in self.materials):
-                self.materials.animations.append(segment.animations_instance)
-            # 气泡效果
-            if segment.bubble is not None:
-                self.materials.filters.append(segment.bubble)
-            # 花字效果
-            if segment.effect is not None:
-                self.materials.filters.append(segment.effect)
-            # 字体样式
-            self.materials.texts.append(segment.export_material())
-
-        # 添加片段素材
-        if isinstance(segment, (VideoSegment, AudioSegment)):
-            self.add_material(segment.material_instance)
+        所有片段通过检查后才会被加入轨道, 若检查失败则草稿不受影响
+
+        Args:
+            segments (`Iterable[VideoSegment | StickerSegment | AudioSegment | TextSegment]`): 要添加的片段, 无需按时间排序
+            track_name (`str`, optional): 添加到的轨道名称. 当此类型的轨道仅有一条时可省略.
 
+        Raises:
+            `NameError`: 未找到指定名称的轨道, 或必须提供`track_name`参数时未提供
+            `TypeError`: 片段类型不匹配轨道类型
+            `SegmentOverlap`: 新片段之间或与已有片段重叠
+            `ValueError`: 片段截取的素材时间范围超出了素材时长. 对素材时长尚未读取的片段, 此检查推迟至导出时进行
+        """
+        segments = list(segments)
+        if not segments:
+            return self
+        target = self._get_track(type(segments[0]), track_name)
+        unchecked = [segment for segment in segments if isinstance(segment, (VideoSegment, AudioSegment))
+                     and not segment.check_source_timerange(force=False)]
+
+        # 加入轨道并更新时长
+        target.extend(segments)
+        self._unchecked_segments.extend(unchecked)
+        self.duration = max(self.duration, max(segment.end for segment in segments))
+
+        self._register_materials(segments)
         return self
 
+    def _register_materials(self, segments: List[BaseSegment]) -> None:
+        """自动添加各片段所引用的素材, 以id判断的已有素材不重复添加"""
+        materials = self.materials
+
+        def add_once(target: List[Any], item: Any) -> None:
+            if item not in materials:
+                target.append(item)
+
+        for segment in segments:
+            if isinstance(segment, VideoSegment):
+                # 出入场等动画
+                if segment.animations_instance is not None:
+                    add_once(materials.animations, segment.animations_instance)
+                # 特效
+                for effect in segment.effects:
+                    add_once(materials.video_effects, effect)
+                # 滤镜
+                for filter_ in segment.filters:
+                    add_once(materials.filters, filter_)
+                # 蒙版
+                if segment.mask is not None:
+                    materials.masks.append(segment.mask.export_json())
+                # 转场
+                if segment.transition is not None:
+                    add_once(materials.transitions, segment.transition)
+                # 背景填充
+                if segment.background_filling is not None:
+                    materials.canvases.append(segment.background_filling)
+
+                materials.speeds.append(segment.speed)
+                # 片段素材
+                add_once(materials.videos, segment.material_instance)
+            elif isinstance(segment, StickerSegment):
+                materials.stickers.append(segment.export_material())
+            elif isinstance(segment, AudioSegment):
+                # 淡入淡出
+                if segment.fade is not None:
+                    add_once(materials.audio_fades, segment.fade)
+                # 特效
+                for effect in segment.effects:
+                    add_once(materials.audio_effects, effect)
+                materials.speeds.append(segment.speed)
+                # 片段素材
+                add_once(materials.audios, segment.material_instance)
+            elif isinstance(segment, TextSegment):
+                # 出入场等动画
+                if segment.animations_instance is not None:
+                    add_once(materials.animations, segment.animations_instance)
+                # 气泡效果
+                if segment.bubble is not None:
+                    materials.filters.append(segment.bubble)
+                # 花字效果
+                if segment.effect is not None:
+                    materials.filters.append(segment.effect)
+                # 字体样式
+                materials.texts.append(segment.export_material())
+
     def add_effect(self, effect: Union[VideoSceneEffectType, VideoCharacterEffectType],
                    t_range: Timerange, track_name: Optional[str] = None, *,
                    params: Optional[List[Optional[float]]] = None) -> "ScriptFile":
@@ -567,7 +654,7 @@ class ScriptFile:
             material_ids.update(extra_refs)
 
         # 复制素材
-        for material_type, material_list in source_file.imported_materials.items():
+        for material_type, material_list in source_file._imported_material_items():
             for material in material_list:
                 if material.get("id") in material_ids:
                     if material_type not in self.imported_materials:
@@ -623,7 +710,8 @@ class ScriptFile:
     def replace_material_by_seg(self, track: EditableTrack, segment_index: int, material: Union[VideoMaterial, AudioMaterial],
                                 source_timerange: Optional[Timerange] = None, *,
                                 handle_shrink: ShrinkMode = ShrinkMode.cut_tail,
-                                handle_extend: Union[ExtendMode, List[ExtendMode]] = ExtendMode.cut_material_tail) -> "ScriptFile":
+                                handle_extend: Union[ExtendMode, List[ExtendMode]] = ExtendMode.cut_material_tail,
+                                align_to_scene: bool = False) -> "ScriptFile":
         """替换指定音视频轨道上指定片段的素材, 暂不支持变速片段的素材替换
 
         Args:
@@ -634,6 +722,8 @@ class ScriptFile:
             handle_shrink (`Shrink_mode`, optional): 新素材比原素材短时的处理方式, 默认为裁剪尾部, 使片段长度与素材一致.
             handle_extend (`Extend_mode` or `List[Extend_mode]`, optional): 新素材比原素材长时的处理方式, 将按顺序逐个尝试直至成功或抛出异常.
                 默认为截断素材尾部, 使片段维持原长不变
+            align_to_scene (`bool`, optional): 未指定`source_timerange`时, 是否从新视频素材中选取一段从镜头边界开始且与原片段等长的部分,
+                参见`scene_index.choose_source_timerange`. 需要NumPy及ffmpeg, 每个素材的分析结果会被缓存. 默认为否.
 
         Raises:
             `IndexError`: `segment_index`越界
@@ -653,6 +743,8 @@ class ScriptFile:
         if source_timerange is None:
             if isinstance(material, VideoMaterial) and (material.material_type == "photo"):
                 source_timerange = Timerange(0, seg.duration)
+            elif align_to_scene and isinstance(material, VideoMaterial):
+                source_timerange = scene_index.choose_source_timerange(material, seg.duration) or Timerange(0, material.duration)
             else:
                 source_timerange = Timerange(0, material.duration)
 
@@ -709,11 +801,11 @@ class ScriptFile:
                     raise ValueError(f"正常文本片段只能有一个文字内容, 但替换内容是 {text}")
                 text = text[0]
 
-            content = json.loads(mat["content"])
+            content = serializer.loads(mat["content"])
             if recalc_style:
                 content["styles"] = __recalc_style_range(len(content["text"]), len(text), content["styles"])
             content["text"] = text
-            mat["content"] = json.dumps(content, ensure_ascii=False)
+            mat["content"] = serializer.dumps_embedded(content)
             replaced = True
             break
         if replaced:
@@ -736,12 +828,12 @@ class ScriptFile:
                         continue
 
                     try:
-                        content = json.loads(mat["content"])
+                        content = serializer.loads(mat["content"])
                         if recalc_style:
                             content["styles"] = __recalc_style_range(len(content["text"]), len(new_text), content["styles"])
                         content["text"] = new_text
-                        mat["content"] = json.dumps(content, ensure_ascii=False)
-                    except json.JSONDecodeError:
+                        mat["content"] = serializer.dumps_embedded(content)
+                    except ValueError:  # 各后端的解析错误均派生自ValueError
                         mat["content"] = new_text
                     except TypeError:
                         mat["content"] = new_text
@@ -771,38 +863,228 @@ class ScriptFile:
             if effect["type"] == "text_effect":
                 print("\tResource id: %s '%s'" % (effect["resource_id"], effect.get("name", "")))
 
-    def dumps(self) -> str:
-        """将草稿文件内容导出为JSON字符串"""
-        self.content["fps"] = self.fps
-        self.content["duration"] = self.duration
-        self.content["canvas_config"] = {"width": self.width, "height": self.height, "ratio": "original"}
-        self.content["materials"] = self.materials.export_json()
+    def _imported_material_items(self) -> Iterable[Tuple[str, List[Dict[str, Any]]]]:
+        """逐类别返回导入素材的当前内容, 均为普通列表"""
+        return unwrap(self.imported_materials).items()
+
+    def dumps(self, *, compact: Optional[bool] = None) -> str:
+        """将草稿文件内容导出为JSON字符串
+
+        Args:
+            compact (`bool`, optional): 是否以紧凑格式(不含缩进及多余空白)导出, 默认使用`serializer.set_compact`设置的全局选项.
+        """
+        return serializer.dumps(self._export_content(), compact=compact)
+
+    def _export_content(self, *, lazy: bool = False) -> Dict[str, Any]:
+        """构造要导出的草稿数据, 此过程不修改`content`及各素材列表, 因而可重复调用
+
+        Args:
+            lazy (`bool`, optional): 是否令各素材列表及片段列表按需导出(`LazyList`), 用于流式写入. 默认为否.
+
+        Raises:
+            `ValueError`: 有片段截取的素材时间范围超出了素材时长
+        """
+        # 完成此前因素材时长未知而推迟的检查
+        while self._unchecked_segments:
+            self._unchecked_segments[-1].check_source_timerange()
+            self._unchecked_segments.pop()
+
+        content = dict(self.content)
+        content["fps"] = self.fps
+        content["duration"] = self.duration
+        content["canvas_config"] = {"width": self.width, "height": self.height, "ratio": "original"}
 
         # 合并导入的素材
-        for material_type, material_list in self.imported_materials.items():
-            if material_type not in self.content["materials"]:
-                self.content["materials"][material_type] = material_list
+        materials = self.materials.export_json(lazy=lazy)
+        for material_type, material_list in self._imported_material_items():
+            if material_type not in materials:
+                materials[material_type] = material_list
+            elif lazy:
+                own_list = materials[material_type]
+                materials[material_type] = util.LazyList(
+                    len(own_list) + len(material_list),
+                    lambda own_list=own_list, material_list=material_list: itertools.chain(own_list, material_list))
             else:
-                self.content["materials"][material_type].extend(material_list)
+                materials[material_type] = materials[material_type] + material_list
+        content["materials"] = materials
 
         # 对轨道排序并导出
         track_list: List[BaseTrack] = list(self.imported_tracks + list(self.tracks.values()))  # 新加入的轨道在列表末尾（上层）
         track_list.sort(key=lambda track: track.render_index)
-        self.content["tracks"] = [track.export_json() for track in track_list]
+        if lazy:
+            content["tracks"] = util.LazyList(len(track_list), lambda: (track.export_json(lazy=True) for track in track_list))
+        else:
+            content["tracks"] = [track.export_json() for track in track_list]
 
-        return json.dumps(self.content, ensure_ascii=False, indent=4)
+        return content
 
-    def dump(self, file_path: str) -> None:
-        """将草稿文件内容写入文件"""
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(self.dumps())
+    def _try_patch(self) -> Optional[bytes]:
+        """在补丁模式下, 将发生变化的值替换到模板文件的原始内容中, 得到新的草稿内容
 
-    def save(self) -> None:
+        Returns:
+            `bytes`: 替换后的内容; 若不在补丁模式下, 或草稿结构已发生变化而无法以补丁方式写入, 则返回None
+        """
+        if self._patch_source is None:
+            return None
+
+        # 添加了新的轨道或素材, 或修改了画布尺寸
+        if self.tracks or any(self.materials.export_json().values()):
+            return None
+        canvas_config = self.content["canvas_config"]
+        if self.width != canvas_config["width"] or self.height != canvas_config["height"]:
+            return None
+
+        # 修改了导入的轨道, 只需比较可能有所改动的轨道
+        original_tracks = self.content["tracks"]
+        if len(self.imported_tracks) != len(original_tracks):
+            return None
+        for track, original_track in zip(self.imported_tracks, original_tracks):
+            if not track.dirty and unwrap(track.raw_data) is original_track:
+                continue
+            if track.export_json() != original_track:
+                return None
+
+        changes = json_patch.diff_materials(self.content["materials"], unwrap(self.imported_materials))
+        if changes is None:
+            return None
+        for key in ("fps", "duration"):
+            if getattr(self, key) != self.content[key]:
+                changes[(key,)] = getattr(self, key)
+        if not changes:
+            return self._patch_source
+
+        if self._patch_index is None:
+            self._patch_index = json_patch.index_draft_values(self._patch_source)
+        replacements: List[Tuple[int, int, bytes]] = []
+        for path, value in changes.items():
+            value_bytes = serializer.dumps_embedded(value).encode("utf-8")
+            span = self._patch_index.get(path)
+            if span is not None:
+                replacements.append((span[0], span[1], value_bytes))
+                continue
+
+            # 新增的字段, 插入到原素材最后一个字段之后
+            original_mat = self.content["materials"][path[1]][path[2]]
+            key_bytes = serializer.dumps_embedded(path[-1]).encode("utf-8")
+            if original_mat:
+                span = self._patch_index.get(path[:-1] + (list(original_mat)[-1],))
+                if span is None:
+                    return None
+                replacements.append((span[1], span[1], b", " + key_bytes + b": " + value_bytes))
+            else:
+                span = self._patch_index.get(path[:-1])
+                if span is None:
+                    return None
+                replacements.append((span[0] + 1, span[0] + 1, key_bytes + b": " + value_bytes))
+
+        return json_patch.splice(self._patch_source, replacements)
+
+    def dump(self, file_path: str, *, stream: bool = False, compact: Optional[bool] = None, atomic: bool = False,
+             skip_unchanged: bool = False) -> bool:
+        """将草稿文件内容写入文件
+
+        Args:
+            file_path (`str`): 写入的文件路径
+            stream (`bool`, optional): 是否流式写入, 即逐个导出素材及片段并分块写入文件, 而不在内存中构造完整的JSON字符串.
+                流式写入总是使用标准库编码器, 输出内容与以标准库非流式写入时完全一致. 默认为否.
+            compact (`bool`, optional): 是否以紧凑格式导出, 参见`dumps`方法.
+            atomic (`bool`, optional): 是否原子写入, 即先写入同目录下的临时文件并落盘, 再重命名为目标文件.
+                此时写入中途出错或进程崩溃均不会留下不完整的草稿文件. 默认为否.
+            skip_unchanged (`bool`, optional): 导出内容与现有文件完全一致时是否跳过写入, 从而不改变其修改时间, 避免剪映重新扫描草稿.
+                通过比较二者的指纹判断, 结果会计入`file_io.get_save_report()`. 默认为否.
+
+        在补丁模式下(参见`load_template`), 若未指定`stream`及`compact`且草稿结构未发生变化, 则以补丁方式写入.
+
+        Returns:
+            `bool`: 是否实际写入了文件, 仅在`skip_unchanged`为真时可能为否
+        """
+        patched = self._try_patch() if not stream and compact is None else None
+        chunks: Iterable[Union[str, bytes]]
+        if patched is not None:
+            chunks = (patched,)
+        elif stream:
+            chunks = serializer.make_stream_encoder(compact=compact).iterencode(self._export_content(lazy=True))
+        else:
+            chunks = (self.dumps(compact=compact),)
+        return file_io.write_file(file_path, chunks, binary=patched is not None,
+                                  atomic=atomic, skip_unchanged=skip_unchanged)
+
+    def save(self, *, stream: bool = False, compact: Optional[bool] = None, atomic: bool = False,
+             skip_unchanged: bool = False) -> bool:
         """保存草稿文件至打开时的路径
 
+        Args:
+            stream (`bool`, optional): 是否流式写入, 参见`dump`方法. 默认为否.
+            compact (`bool`, optional): 是否以紧凑格式导出, 参见`dumps`方法.
+            atomic (`bool`, optional): 是否原子写入, 参见`dump`方法. 默认为否.
+            skip_unchanged (`bool`, optional): 内容未变化时是否跳过写入, 参见`dump`方法. 默认为否.
+
+        Returns:
+            `bool`: 是否实际写入了文件
+
+        Raises:
+            `ValueError`: 没有设置保存路径
+        """
+        if self.save_path is None:
+            raise ValueError("没有设置保存路径, 可能不在模板模式下")
+        return self.dump(self.save_path, stream=stream, compact=compact, atomic=atomic, skip_unchanged=skip_unchanged)
+
+    async def asave(self, *, stream: bool = False, compact: Optional[bool] = None, atomic: bool = False,
+                    skip_unchanged: bool = False) -> bool:
+        """`save`的异步版本, 在线程池中导出并写入草稿文件, 参数与其相同. 参见`async_io.configure`
+
+        注意在保存完成前不应修改此草稿
+
+        Returns:
+            `bool`: 是否实际写入了文件
+
+        Raises:
+            `ValueError`: 没有设置保存路径
+        """
+        if self.save_path is None:
+            raise ValueError("没有设置保存路径, 可能不在模板模式下")
+        return await async_io.run_blocking(self.save, stream=stream, compact=compact, atomic=atomic,
+                                           skip_unchanged=skip_unchanged)
+
+    def save_async(self, *, compact: Optional[bool] = None, skip_unchanged: bool = False) -> "Future[bool]":
+        """在后台线程中原子地保存草稿文件至打开时的路径
+
+        草稿内容在调用时即被导出为JSON字符串, 此后对草稿的修改不会影响本次保存的内容; 写入、落盘及重命名则在后台线程中进行.
+        所有草稿的后台保存任务按提交顺序依次执行, 可调用`flush`等待本草稿的保存任务完成并获取其中出现的异常.
+
+        Args:
+            compact (`bool`, optional): 是否以紧凑格式导出, 参见`dumps`方法.
+            skip_unchanged (`bool`, optional): 内容未变化时是否跳过写入, 参见`dump`方法. 默认为否.
+
+        Returns:
+            `Future[bool]`: 保存任务, 其结果为是否实际写入了文件
+
         Raises:
             `ValueError`: 没有设置保存路径
         """
         if self.save_path is None:
             raise ValueError("没有设置保存路径, 可能不在模板模式下")
-        self.dump(self.save_path)
+
+        save_path = self.save_path
+        data: Union[str, bytes, None] = self._try_patch() if compact is None else None
+        if data is None:
+            data = self.dumps(compact=compact)
+        future = file_io.submit_write(lambda: file_io.write_file(save_path, (data,), binary=isinstance(data, bytes),
+                                                                 atomic=True, skip_unchanged=skip_unchanged))
+        self._pending_saves.append(future)
+        return future
+
+    def flush(self) -> None:
+        """等待通过`save_async`提交的所有保存任务完成
+
+        Raises:
+            `Exception`: 若有保存任务失败, 则在所有任务结束后抛出其中第一个异常
+        """
+        pending, self._pending_saves = self._pending_saves, []
+        error: Optional[BaseException] = None
+        for future in pending:
+            exc = future.exception()
+            if exc is not None and error is None:
+                error = exc
+        if error is not None:
+            raise error
@@ -6,6 +6,7 @@ from typing import Optional, Dict, List, Any, Union
 from .animation import SegmentAnimations
 from .time_util import Timerange, tim
 from .keyframe import KeyframeList, KeyframeProperty
+from .local_materials import LazyVideoMaterial, LazyAudioMaterial
 
 class BaseSegment:
     """片段基类"""
@@ -173,6 +174,26 @@ class MediaSegment(BaseSegment):
 
         self.extra_material_refs = [self.speed.global_id]
 
+    def _check_source_end(self, material: Any, force: bool) -> bool:
+        """检查截取的素材时间范围是否超出了素材时长
+
+        Args:
+            material (`VideoMaterial` or `AudioMaterial`): 片段所用的素材
+            force (`bool`): 素材为时长未知的延迟加载素材时, 是否读取素材以完成检查, 否则推迟检查
+
+        Returns:
+            `bool`: 是否完成了检查
+
+        Raises:
+            `ValueError`: 截取的素材时间范围超出了素材时长
+        """
+        if not force and isinstance(material, (LazyVideoMaterial, LazyAudioMaterial)) and not material.is_known("duration"):
+            return False
+        assert self.source_timerange is not None
+        if self.source_timerange.end > material.duration:
+            raise ValueError(f"截取的素材时间范围 {self.source_timerange} 超出了素材时长({material.duration})")
+        return True
+
     def export_json(self) -> Dict[str, Any]:
         """返回通用于音频和视频片段的默认属性"""
         ret = super().export_json()
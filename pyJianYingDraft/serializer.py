@@ -0,0 +1,146 @@
+"""JSON序列化后端的封装, 在安装了orjson/ujson/rapidjson时自动选用, 否则回退到标准库json
+
+草稿文件的读取与写入均经由此模块进行, 可通过`set_backend`及`set_compact`进行全局设置
+"""
+
+import json
+
+from typing import Optional, Literal, Callable
+from typing import Dict, List, Any
+
+Backend_name = Literal["orjson", "ujson", "rapidjson", "json"]
+
+class JsonBackend:
+    """一种JSON库的封装"""
+
+    name: Backend_name
+    """后端名称, 即相应库的模块名"""
+
+    loads: Callable[[str], Any]
+    """解析JSON字符串"""
+    dumps_compact: Callable[[Any], str]
+    """导出为不含多余空白的JSON字符串"""
+    dumps_pretty: Optional[Callable[[Any], str]]
+    """导出为以4空格缩进的JSON字符串, 为None表示此后端不支持, 届时使用标准库"""
+
+    def __init__(self, name: Backend_name, loads: Callable[[str], Any], dumps_compact: Callable[[Any], str],
+                 dumps_pretty: Optional[Callable[[Any], str]]):
+        self.name = name
+        self.loads = loads
+        self.dumps_compact = dumps_compact
+        self.dumps_pretty = dumps_pretty
+
+def _make_backend(name: Backend_name) -> JsonBackend:
+    """构造指定名称的后端, 若相应的库未安装则抛出`ImportError`"""
+    if name == "orjson":
+        import orjson
+        # orjson仅支持2空格缩进, 故格式化输出交由标准库处理
+        return JsonBackend(name, orjson.loads, lambda obj: orjson.dumps(obj).decode("utf-8"), None)
+    if name == "ujson":
+        import ujson
+        return JsonBackend(name, ujson.loads,
+                           lambda obj: ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False),
+                           lambda obj: ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, indent=4))
+    if name == "rapidjson":
+        import rapidjson
+        return JsonBackend(name, rapidjson.loads,
+                           lambda obj: rapidjson.dumps(obj, ensure_ascii=False),
+                           lambda obj: rapidjson.dumps(obj, ensure_ascii=False, indent=4))
+    if name == "json":
+        return JsonBackend(name, json.loads,
+                           lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")),
+                           lambda obj: json.dumps(obj, ensure_ascii=False, indent=4))
+    raise ValueError(f"不支持的JSON后端 '{name}'")
+
+_PREFERRED_BACKENDS: List[Backend_name] = ["orjson", "ujson", "rapidjson", "json"]
+"""自动选择后端时的优先顺序"""
+
+_backend_cache: Dict[Backend_name, JsonBackend] = {}
+_backend: Optional[JsonBackend] = None
+_compact: bool = False
+
+def get_backend(name: Optional[Backend_name] = None) -> JsonBackend:
+    """获取指定名称的后端, 不指定时返回当前全局使用的后端
+
+    Raises:
+        `ImportError`: 指定的后端所依赖的库未安装
+        `ValueError`: 不支持的后端名称
+    """
+    global _backend
+    if name is None:
+        if _backend is None:
+            _backend = _auto_backend()
+        return _backend
+
+    if name not in _backend_cache:
+        _backend_cache[name] = _make_backend(name)
+    return _backend_cache[name]
+
+def _auto_backend() -> JsonBackend:
+    for name in _PREFERRED_BACKENDS[:-1]:
+        try:
+            return get_backend(name)
+        except ImportError:
+            continue
+    return get_backend("json")
+
+def set_backend(name: Optional[Backend_name]) -> None:
+    """设置全局使用的JSON后端
+
+    Args:
+        name (`str`, optional): 后端名称, 可选`orjson`, `ujson`, `rapidjson`或`json`(标准库).
+            为None时按上述顺序自动选用第一个已安装的库.
+
+    Raises:
+        `ImportError`: 指定的后端所依赖的库未安装
+    """
+    global _backend
+    _backend = _auto_backend() if name is None else get_backend(name)
+
+def set_compact(compact: bool) -> None:
+    """设置是否默认以紧凑格式(不含缩进及多余空白)导出草稿, 默认为否, 即以4空格缩进导出"""
+    global _compact
+    _compact = compact
+
+def is_compact(compact: Optional[bool] = None) -> bool:
+    """解析单次调用的`compact`参数, 为None时使用全局设置"""
+    return _compact if compact is None else compact
+
+def loads(s: str) -> Any:
+    """使用当前后端解析JSON字符串"""
+    return get_backend().loads(s)
+
+def load_file(path: str) -> Any:
+    """读取并解析UTF-8编码的JSON文件"""
+    with open(path, "r", encoding="utf-8") as f:
+        return loads(f.read())
+
+def dumps(obj: Any, *, compact: Optional[bool] = None) -> str:
+    """将一份完整的草稿数据导出为JSON字符串
+
+    Args:
+        obj (`Any`): 要导出的数据
+        compact (`bool`, optional): 是否以紧凑格式导出, 默认使用全局设置.
+            非紧凑格式以4空格缩进, 后端不支持时使用标准库.
+    """
+    backend = get_backend()
+    if is_compact(compact):
+        return backend.dumps_compact(obj)
+    if backend.dumps_pretty is None:
+        return get_backend("json").dumps_pretty(obj)  # type: ignore
+    return backend.dumps_pretty(obj)
+
+def dumps_embedded(obj: Any, *, compact: Optional[bool] = None) -> str:
+    """导出嵌入在其它JSON字符串字段中的数据(如文本素材的`content`)
+
+    非紧凑格式下与`json.dumps(obj, ensure_ascii=False)`的输出保持一致
+    """
+    if is_compact(compact):
+        return get_backend().dumps_compact(obj)
+    return json.dumps(obj, ensure_ascii=False)
+
+def make_stream_encoder(*, compact: Optional[bool] = None) -> json.JSONEncoder:
+    """构造用于流式写入的标准库编码器, 其输出格式与`dumps`一致"""
+    if is_compact(compact):
+        return json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    return json.JSONEncoder(ensure_ascii=False, indent=4)
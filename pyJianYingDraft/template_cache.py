@@ -0,0 +1,120 @@
+"""进程级的草稿模板缓存, 避免批量生成草稿时反复读取并解析同一个模板文件
+
+缓存以`(绝对路径, st_mtime_ns, st_size)`为键, 以`marshal`格式保存解析结果, 每次读取时反序列化得到一份独立的副本.
+可选地将缓存同时写入磁盘上的缓存目录, 以便在多个进程之间复用
+"""
+
+import os
+import sys
+import marshal
+import hashlib
+
+from typing import Optional, Tuple
+from typing import Dict, Any
+
+from . import serializer
+from .cache_util import LruCache, prepare_cache_dir
+
+Cache_key = Tuple[str, int, int]
+
+_CACHE_DIR: Optional[str] = None
+
+_entries: "LruCache[Cache_key, bytes]" = LruCache(8)
+
+def configure(*, max_entries: Optional[int] = None, cache_dir: Optional[str] = "") -> None:
+    """设置模板缓存
+
+    Args:
+        max_entries (`int`, optional): 内存中最多缓存的模板数量, 超出时淘汰最久未使用者; 为0时禁用内存缓存. 不指定则保持不变, 初始为8.
+        cache_dir (`str`, optional): 磁盘缓存目录, 为None时禁用磁盘缓存. 不指定则保持不变, 初始为禁用.
+    """
+    global _CACHE_DIR
+    if max_entries is not None:
+        _entries.resize(max_entries)
+    if cache_dir != "":
+        _CACHE_DIR = prepare_cache_dir(cache_dir)
+
+def clear() -> None:
+    """清空内存中的模板缓存, 磁盘缓存不受影响"""
+    _entries.clear()
+
+def _make_key(json_path: str) -> Cache_key:
+    stat = os.stat(json_path)
+    return (os.path.abspath(json_path), stat.st_mtime_ns, stat.st_size)
+
+def _disk_path(key: Cache_key) -> Optional[str]:
+    if _CACHE_DIR is None:
+        return None
+    # marshal格式随Python版本变化, 故一并纳入文件名
+    digest = hashlib.sha1(repr((key, sys.version_info[:2], marshal.version)).encode("utf-8")).hexdigest()
+    return os.path.join(_CACHE_DIR, digest + ".marshal")
+
+def _lookup(key: Cache_key) -> Optional[bytes]:
+    data = _entries.get(key)
+    if data is not None:
+        return data
+
+    disk_path = _disk_path(key)
+    if disk_path is not None and os.path.exists(disk_path):
+        try:
+            with open(disk_path, "rb") as f:
+                data = f.read()
+            marshal.loads(data)  # 校验缓存文件是否完整
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        _entries.put(key, data)
+        return data
+    return None
+
+def load(json_path: str) -> Dict[str, Any]:
+    """读取并解析草稿模板, 若缓存中已有相同路径、修改时间及大小的文件的解析结果则直接复制之
+
+    Returns:
+        `Dict[str, Any]`: 解析得到的草稿内容, 每次调用均返回独立的副本, 调用者可以任意修改
+
+    Raises:
+        `FileNotFoundError`: 文件不存在
+    """
+    if _entries.max_entries == 0 and _CACHE_DIR is None:
+        return serializer.load_file(json_path)
+
+    key = _make_key(json_path)
+    data = _lookup(key)
+    if data is not None:
+        return marshal.loads(data)
+
+    content = serializer.load_file(json_path)
+    data = marshal.dumps(content)
+    _entries.put(key, data)
+
+    disk_path = _disk_path(key)
+    if disk_path is not None:
+        tmp_path = "%s.%d.tmp" % (disk_path, os.getpid())
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, disk_path)
+        except OSError:
+            pass  # 磁盘缓存写入失败不影响正常加载
+    return content
+
+def alias(json_path: str, source_path: str) -> None:
+    """声明`json_path`是`source_path`的逐字节副本, 使其能直接复用后者的缓存
+
+    仅当二者的修改时间及大小均一致时生效, 用于复制模板草稿后立即打开副本的场景.
+    若`source_path`尚未被缓存, 则先解析并缓存之
+    """
+    if _entries.max_entries == 0:
+        return
+    try:
+        key, source_key = _make_key(json_path), _make_key(source_path)
+    except OSError:
+        return
+    if key[1:] != source_key[1:]:
+        return
+    data = _lookup(source_key)
+    if data is None:
+        load(source_path)
+        data = _lookup(source_key)
+    if data is not None:
+        _entries.put(key, data)
@@ -1,15 +1,17 @@
 """与模板模式相关的类及函数等"""
 
-from enum import Enum
 from copy import deepcopy
+from enum import Enum
 
 from . import util
 from . import exceptions
+from .cow_json import CowDict, unwrap
 from .time_util import Timerange
 from .segment import BaseSegment
 from .track import BaseTrack, TrackType
 from .local_materials import VideoMaterial, AudioMaterial
 
+from typing import Optional, Type, Iterator
 from typing import List, Dict, Any
 
 class ShrinkMode(Enum):
@@ -40,20 +42,31 @@ class ExtendMode(Enum):
     push_tail = "push_tail"
     """延伸尾部, 若有必要则依次后移后续片段, 此方法总是成功"""
 
+def _deepcopy_keeping_cow(obj: Any, memo: Dict[int, Any]) -> Any:
+    """深复制导入的片段或轨道, 其`raw_data`仍为`CowDict`, 且在未被修改时与原对象共享原始数据"""
+    new = obj.__class__.__new__(obj.__class__)
+    memo[id(obj)] = new
+    for name, value in obj.__dict__.items():
+        new.__dict__[name] = value.fork() if name == "raw_data" else deepcopy(value, memo)
+    return new
+
 class ImportedSegment(BaseSegment):
     """导入的片段"""
 
-    raw_data: Dict[str, Any]
-    """原始json数据"""
+    raw_data: CowDict
+    """原始json数据, 与模板内容写时复制地共享"""
 
     __DATA_ATTRS = ["material_id", "target_timerange"]
     def __init__(self, json_data: Dict[str, Any]):
-        self.raw_data = deepcopy(json_data)
+        self.raw_data = CowDict(json_data)
 
         util.assign_attr_with_json(self, self.__DATA_ATTRS, json_data)
 
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ImportedSegment":
+        return _deepcopy_keeping_cow(self, memo)
+
     def export_json(self) -> Dict[str, Any]:
-        json_data = deepcopy(self.raw_data)
+        json_data = dict(unwrap(self.raw_data))
         json_data.update(util.export_attr_to_json(self, self.__DATA_ATTRS))
         return json_data
 
@@ -78,19 +91,40 @@ class ImportedMediaSegment(ImportedSegment):
 class ImportedTrack(BaseTrack):
     """模板模式下导入的轨道"""
 
-    raw_data: Dict[str, Any]
-    """原始轨道数据"""
+    raw_data: CowDict
+    """原始轨道数据, 与模板内容写时复制地共享"""
 
-    def __init__(self, json_data: Dict[str, Any]):
+    _lazy: bool
+    """是否以按需加载模式导入, 此时片段在首次访问时才构造, 且未改动的轨道原样导出"""
+    _raw_render_index: int
+
+    def __init__(self, json_data: Dict[str, Any], *, lazy: bool = False):
         self.track_type = TrackType.from_name(json_data["type"])
         self.name = json_data["name"]
         self.track_id = json_data["id"]
         self.render_index = max([int(seg["render_index"]) for seg in json_data["segments"]], default=0)
 
-        self.raw_data = deepcopy(json_data)
+        self._lazy = lazy
+        self._raw_render_index = self.render_index
+        self.raw_data = CowDict(json_data)
 
-    def export_json(self) -> Dict[str, Any]:
-        ret = deepcopy(self.raw_data)
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ImportedTrack":
+        return _deepcopy_keeping_cow(self, memo)
+
+    def _modified(self) -> bool:
+        """轨道属性是否相对原始数据有所改动"""
+        return self.name != self.raw_data["name"] or self.track_id != self.raw_data["id"] \
+            or self.render_index != self._raw_render_index
+
+    @property
+    def dirty(self) -> bool:
+        """轨道自导入以来是否可能有所改动, 为否时其导出结果必与原始数据一致"""
+        return self._modified() or self.raw_data.modified
+
+    def export_json(self, *, lazy: bool = False) -> Dict[str, Any]:
+        if self._lazy and not self._modified():
+            return unwrap(self.raw_data)  # 未改动的轨道原样导出
+        ret = dict(unwrap(self.raw_data))
         ret.update({
             "name": self.name,
             "id": self.track_id
@@ -100,51 +134,86 @@ class ImportedTrack(BaseTrack):
 class EditableTrack(ImportedTrack):
     """模板模式下导入且可修改的轨道(音视频及文本轨道)"""
 
-    segments: List[ImportedSegment]
-    """该轨道包含的片段列表"""
+    _segment_type: Type[ImportedSegment] = ImportedSegment
+    """片段所对应的类型"""
+    _segments: Optional[List[ImportedSegment]]
+    _touched: bool
+    """片段列表是否曾被外部访问或替换, 此后片段及列表本身均可能被修改"""
+
+    def __init__(self, json_data: Dict[str, Any], *, lazy: bool = False):
+        super().__init__(json_data, lazy=lazy)
+        self._segments = None
+        self._touched = False
+        if not lazy:
+            self._segments = [self._segment_type(seg) for seg in unwrap(self.raw_data)["segments"]]
+
+    def _segment_list(self) -> List[ImportedSegment]:
+        """获取片段列表, 但不将轨道标记为可能已修改"""
+        if self._segments is None:
+            self._segments = [self._segment_type(seg) for seg in unwrap(self.raw_data)["segments"]]
+        return self._segments
+
+    @property
+    def segments(self) -> List[ImportedSegment]:
+        """该轨道包含的片段列表, 按需加载模式下在首次访问时构造"""
+        self._touched = True
+        return self._segment_list()
+    @segments.setter
+    def segments(self, value: List[ImportedSegment]):
+        self._touched = True
+        self._segments = value
 
     def __len__(self):
-        return len(self.segments)
+        if self._segments is None:
+            return len(self.raw_data["segments"])
+        return len(self._segments)
 
     @property
     def start_time(self) -> int:
         """轨道起始时间, 微秒"""
-        if len(self.segments) == 0:
+        segments = self._segment_list()
+        if len(segments) == 0:
             return 0
-        return self.segments[0].target_timerange.start
+        return segments[0].target_timerange.start
 
     @property
     def end_time(self) -> int:
         """轨道结束时间, 微秒"""
-        if len(self.segments) == 0:
+        segments = self._segment_list()
+        if len(segments) == 0:
             return 0
-        return self.segments[-1].target_timerange.end
+        return segments[-1].target_timerange.end
 
-    def export_json(self) -> Dict[str, Any]:
+    def _modified(self) -> bool:
+        return self._touched or super()._modified()
+
+    def iter_segment_json(self) -> Iterator[Dict[str, Any]]:
+        """逐个导出片段的JSON数据, 并为每个片段写入render_index"""
+        for seg in self._segment_list():
+            seg_json = seg.export_json()
+            seg_json["render_index"] = self.render_index
+            yield seg_json
+
+    def export_json(self, *, lazy: bool = False) -> Dict[str, Any]:
         ret = super().export_json()
-        # 为每个片段写入render_index
-        segment_exports = [seg.export_json() for seg in self.segments]
-        for seg in segment_exports:
-            seg["render_index"] = self.render_index
-        ret["segments"] = segment_exports
+        if self._lazy and not self._modified():
+            return ret
+        if lazy:
+            ret["segments"] = util.LazyList(len(self), self.iter_segment_json)
+        else:
+            ret["segments"] = list(self.iter_segment_json())
         return ret
 
 class ImportedTextTrack(EditableTrack):
     """模板模式下导入的文本轨道"""
 
-    def __init__(self, json_data: Dict[str, Any]):
-        super().__init__(json_data)
-        self.segments = [ImportedSegment(seg) for seg in json_data["segments"]]
-
 class ImportedMediaTrack(EditableTrack):
     """模板模式下导入的音频/视频轨道"""
 
-    segments: List[ImportedMediaSegment]
+    segments: List[ImportedMediaSegment]  # type: ignore
     """该轨道包含的片段列表"""
 
-    def __init__(self, json_data: Dict[str, Any]):
-        super().__init__(json_data)
-        self.segments = [ImportedMediaSegment(seg) for seg in json_data["segments"]]
+    _segment_type = ImportedMediaSegment
 
     def check_material_type(self, material: object) -> bool:
         """检查素材类型是否与轨道类型匹配"""
@@ -211,11 +280,11 @@ class ImportedMediaTrack(EditableTrack):
         # 写入素材时间范围
         seg.source_timerange = src_timerange
 
-def import_track(json_data: Dict[str, Any]) -> ImportedTrack:
-    """导入轨道"""
+def import_track(json_data: Dict[str, Any], *, lazy: bool = False) -> ImportedTrack:
+    """导入轨道, 若`lazy`为真则与原始数据共享内容, 并在首次访问时才构造片段"""
     track_type = TrackType.from_name(json_data["type"])
     if not track_type.value.allow_modify:
-        return ImportedTrack(json_data)
+        return ImportedTrack(json_data, lazy=lazy)
     if track_type == TrackType.text:
-        return ImportedTextTrack(json_data)
-    return ImportedMediaTrack(json_data)
+        return ImportedTextTrack(json_data, lazy=lazy)
+    return ImportedMediaTrack(json_data, lazy=lazy)
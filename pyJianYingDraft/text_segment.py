@@ -1,12 +1,12 @@
 """定义文本片段及其相关类"""
 
-import json
 import uuid
 from copy import deepcopy
 
 from typing import Dict, Tuple, Any
 from typing import Union, Optional, Literal
 
+from . import serializer
 from .time_util import Timerange, tim
 from .segment import ClipSettings, VisualSegment
 from .animation import SegmentAnimations, Text_animation
@@ -375,7 +375,7 @@ class TextSegment(VisualSegment):
 
         ret = {
             "id": self.material_id,
-            "content": json.dumps(content_json, ensure_ascii=False),
+            "content": serializer.dumps_embedded(content_json),
 
             "typesetting": int(self.style.vertical),
             "alignment": self.style.align,
@@ -0,0 +1,197 @@
+"""素材缩略图的磁盘缓存, 以及由草稿主视频轨道上的各片段拼成的缩略图总览(contact sheet)
+
+缩略图以素材的内容id(参见`media_probe.content_id`)、时刻及尺寸为键保存于缓存目录中, 仅在首次请求时解码生成.
+解码器可通过`set_decoder`替换, 默认使用imageio(解码视频还需安装imageio-ffmpeg); 缩放及拼接需要NumPy
+"""
+
+import os
+import math
+import tempfile
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union, Callable, Sequence, Tuple
+from typing import Dict, List, Any
+
+from . import media_probe
+from .cache_util import import_numpy
+from .local_materials import VideoMaterial
+from .track import TrackType
+from .template_mode import EditableTrack
+from .script_file import ScriptFile
+
+Decoder = Callable[[str, int], Any]
+"""解码器, 接受文件路径及时刻(微秒), 返回该时刻的画面, 为形如`(高, 宽, 通道数)`或`(高, 宽)`的uint8数组"""
+
+_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "pyJianYingDraft-thumbnails")
+_decoder: Optional[Decoder] = None
+
+def configure(*, cache_dir: Optional[str] = None) -> None:
+    """设置缩略图缓存
+
+    Args:
+        cache_dir (`str`, optional): 缓存目录, 不指定则保持不变, 初始为系统临时目录下的`pyJianYingDraft-thumbnails`.
+    """
+    global _CACHE_DIR
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        _CACHE_DIR = cache_dir
+
+def set_decoder(decoder: Optional[Decoder]) -> None:
+    """设置生成缩略图所用的解码器, 为None时恢复使用默认的imageio解码器"""
+    global _decoder
+    _decoder = decoder
+
+def _import_numpy():
+    return import_numpy("生成缩略图")
+
+def imageio_decoder(path: str, time: int) -> Any:
+    """默认的解码器, 使用imageio读取视频中最接近给定时刻的一帧, 或图片的第一帧"""
+    import imageio
+    with imageio.get_reader(path) as reader:
+        fps = reader.get_meta_data().get("fps")
+        index = int(time * fps / 1e6) if fps else 0
+        try:
+            return reader.get_data(index)
+        except IndexError:
+            return reader.get_data(0)
+
+def _downscale(frame: Any, max_size: int) -> Any:
+    """将画面缩小至长边不超过`max_size`, 以分块求均值的方式缩放并统一为RGB格式"""
+    np = _import_numpy()
+    frame = np.asarray(frame)
+    if frame.ndim == 2:
+        frame = np.stack((frame,) * 3, axis=-1)
+    frame = frame[:, :, :3]
+    step = max(1, math.ceil(max(frame.shape[:2]) / max_size))
+    if step > 1:
+        height, width = frame.shape[0] // step * step, frame.shape[1] // step * step
+        blocks = frame[:height, :width].reshape(height // step, step, width // step, step, 3)
+        frame = blocks.mean(axis=(1, 3)).round().astype(np.uint8)
+    return np.ascontiguousarray(frame, dtype=np.uint8)
+
+def thumbnail(source: Union[VideoMaterial, str], time: int = 0, *, max_size: int = 256) -> str:
+    """获取素材在给定时刻的缩略图, 若缓存中没有则解码生成之
+
+    Args:
+        source (`VideoMaterial` or `str`): 视频/图片素材或其文件路径
+        time (`int`, optional): 素材中的时刻, 单位为微秒, 图片素材忽略此项. 默认为0.
+        max_size (`int`, optional): 缩略图长边的最大像素数. 默认为256.
+
+    Returns:
+        `str`: 缩略图文件(JPEG格式)的路径
+
+    Raises:
+        `ImportError`: 未安装NumPy或imageio
+        `FileNotFoundError`: 素材文件不存在
+    """
+    import imageio
+
+    if isinstance(source, VideoMaterial):
+        path = source.path
+        if source.material_type == "photo":
+            time = 0
+    else:
+        path = os.path.abspath(source)
+    thumb_path = os.path.join(_CACHE_DIR, "%s_%d_%d.jpg" % (media_probe.content_id(path), time, max_size))
+    if os.path.exists(thumb_path):
+        return thumb_path
+
+    frame = _downscale((_decoder or imageio_decoder)(path, time), max_size)
+    os.makedirs(_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=_CACHE_DIR, suffix=".jpg")
+    os.close(fd)
+    try:
+        imageio.imwrite(tmp_path, frame)
+        os.replace(tmp_path, thumb_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return thumb_path
+
+def thumbnails(requests: Sequence[Tuple[Union[VideoMaterial, str], int]], *, max_size: int = 256,
+               workers: int = 8) -> List[Optional[str]]:
+    """并发获取多张缩略图, 参见`thumbnail`
+
+    Args:
+        requests (`Sequence[Tuple[VideoMaterial | str, int]]`): 各缩略图的素材(或路径)及时刻
+        max_size (`int`, optional): 缩略图长边的最大像素数. 默认为256.
+        workers (`int`, optional): 并发线程数. 默认为8.
+
+    Returns:
+        `List[Optional[str]]`: 与`requests`一一对应的缩略图路径, 生成失败者为None
+    """
+    def make_one(request: Tuple[Union[VideoMaterial, str], int]) -> Optional[str]:
+        try:
+            return thumbnail(request[0], request[1], max_size=max_size)
+        except (OSError, ValueError, RuntimeError, IndexError):
+            return None
+
+    if workers <= 1 or len(requests) <= 1:
+        return [make_one(request) for request in requests]
+    with ThreadPoolExecutor(max_workers=min(workers, len(requests))) as executor:
+        return list(executor.map(make_one, requests))
+
+def _main_track_requests(script: ScriptFile) -> List[Tuple[str, int]]:
+    """获取草稿主视频轨道(最底层的视频轨道)上各片段的素材路径及其中点时刻"""
+    tracks: List[Any] = [track for track in script.tracks.values() if track.track_type == TrackType.video]
+    tracks += [track for track in script.imported_tracks if track.track_type == TrackType.video]
+    if not tracks:
+        return []
+    main_track = min(tracks, key=lambda track: track.render_index)
+
+    # 素材id -> (路径, 是否为图片)
+    materials: Dict[str, Tuple[str, bool]] = {mat["id"]: (mat["path"], mat.get("type") == "photo")
+                                              for mat in script.imported_materials.get("videos", [])}
+    materials.update({mat.material_id: (mat.path, mat.material_type == "photo") for mat in script.materials.videos})
+    # 导入的轨道经由`_segment_list`读取, 以免被标记为可能已修改而失去原样导出
+    segments = main_track._segment_list() if isinstance(main_track, EditableTrack) else main_track.segments
+    requests: List[Tuple[str, int]] = []
+    for seg in segments:
+        if seg.material_id not in materials:
+            continue
+        path, is_photo = materials[seg.material_id]
+        requests.append((path, 0 if is_photo else seg.source_timerange.start + seg.source_timerange.duration // 2))
+    return requests
+
+def contact_sheet(script: ScriptFile, output_path: str, *, columns: int = 6, tile_size: int = 192,
+                  workers: int = 8) -> int:
+    """将草稿主视频轨道上各片段的缩略图按顺序拼接为一张总览图, 以便无需打开剪映即可快速浏览草稿
+
+    每个片段取其所截取的素材范围的中点处的画面, 无法生成缩略图的片段以黑色图块代替
+
+    Args:
+        script (`ScriptFile`): 草稿文件, 可以是新建的或由模板加载的
+        output_path (`str`): 总览图的输出路径, 格式由扩展名决定
+        columns (`int`, optional): 每行的图块数. 默认为6.
+        tile_size (`int`, optional): 图块的边长. 默认为192.
+        workers (`int`, optional): 生成缩略图的并发线程数. 默认为8.
+
+    Returns:
+        `int`: 总览图中的图块数, 主视频轨道不存在或为空时为0, 此时不生成文件
+
+    Raises:
+        `ImportError`: 未安装NumPy或imageio
+    """
+    import imageio
+    np = _import_numpy()
+
+    requests = _main_track_requests(script)
+    if not requests:
+        return 0
+    thumb_paths = thumbnails(requests, max_size=tile_size, workers=workers)  # type: ignore
+
+    rows = math.ceil(len(requests) / columns)
+    sheet = np.zeros((rows * tile_size, min(columns, len(requests)) * tile_size, 3), dtype=np.uint8)
+    for index, thumb_path in enumerate(thumb_paths):
+        if thumb_path is None:
+            continue
+        image = _downscale(imageio.imread(thumb_path), tile_size)
+        height, width = image.shape[:2]
+        top = index // columns * tile_size + (tile_size - height) // 2
+        left = index % columns * tile_size + (tile_size - width) // 2
+        sheet[top:top + height, left:left + width] = image
+    imageio.imwrite(output_path, sheet)
+    return len(requests)
@@ -1,13 +1,16 @@
 """轨道类及其元数据"""
 
 import uuid
+import heapq
+import bisect
 
 from enum import Enum
 from typing import TypeVar, Generic, Type
-from typing import Dict, List, Any, Union
+from typing import Dict, List, Any, Union, Iterable, Iterator
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 
+from .util import LazyList
 from .exceptions import SegmentOverlap
 from .segment import BaseSegment
 from .video_segment import VideoSegment, StickerSegment
@@ -66,7 +69,8 @@ class BaseTrack(ABC):
     """渲染顺序, 值越大越接近前景"""
 
     @abstractmethod
-    def export_json(self) -> Dict[str, Any]: ...
+    def export_json(self, *, lazy: bool = False) -> Dict[str, Any]:
+        """导出轨道的JSON数据, 若`lazy`为真, 则其中的片段列表为按需导出的`LazyList`"""
 
 Seg_type = TypeVar("Seg_type", bound=BaseSegment)
 class Track(BaseTrack, Generic[Seg_type]):
@@ -76,7 +80,10 @@ class Track(BaseTrack, Generic[Seg_type]):
     """是否静音"""
 
     segments: List[Seg_type]
-    """该轨道包含的片段列表"""
+    """该轨道包含的片段列表, 按开始时间排序"""
+
+    _starts: List[int]
+    """与`segments`一一对应的各片段开始时间, 用于二分查找"""
 
     def __init__(self, track_type: TrackType, name: str, render_index: int, mute: bool):
         self.track_type = track_type
@@ -86,6 +93,7 @@ class Track(BaseTrack, Generic[Seg_type]):
 
         self.mute = mute
         self.segments = []
+        self._starts = []
 
     @property
     def end_time(self) -> int:
@@ -99,9 +107,19 @@ class Track(BaseTrack, Generic[Seg_type]):
         """返回该轨道允许的片段类型"""
         return self.track_type.value.segment_type  # type: ignore
 
+    def _sync_starts(self) -> List[int]:
+        """返回各片段的开始时间, 若`segments`被直接修改过则重建之"""
+        if len(self._starts) != len(self.segments):
+            self.segments.sort(key=lambda seg: seg.target_timerange.start)
+            self._starts = [seg.target_timerange.start for seg in self.segments]
+        return self._starts
+
     def add_segment(self, segment: Seg_type) -> "Track[Seg_type]":
         """向轨道中添加一个片段, 添加的片段必须匹配轨道类型且不与现有片段重叠
 
+        片段按开始时间插入到相应位置, 重叠检查只需与前后相邻的片段比较.
+        注意: 片段加入轨道后不应再修改其`target_timerange`, 否则可能导致重叠检查失效
+
         Args:
             segment (Seg_type): 要添加的片段
 
@@ -112,20 +130,85 @@ class Track(BaseTrack, Generic[Seg_type]):
         if not isinstance(segment, self.accept_segment_type):
             raise TypeError("New segment (%s) is not of the same type as the track (%s)" % (type(segment), self.accept_segment_type))
 
-        # 检查片段是否重叠
-        for seg in self.segments:
-            if seg.overlaps(segment):
-                raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
-                                     .format(segment.target_timerange.start, segment.target_timerange.end))
+        # 检查片段是否与前后相邻的片段重叠
+        starts = self._sync_starts()
+        start = segment.target_timerange.start
+        index = bisect.bisect_right(starts, start)
+        neighbors = self.segments[max(index - 1, 0):index + 1]
+        if any(seg.overlaps(segment) for seg in neighbors):
+            raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
+                                 .format(segment.target_timerange.start, segment.target_timerange.end))
+
+        starts.insert(index, start)
+        self.segments.insert(index, segment)
+        return self
+
+    def extend(self, segments: Iterable[Seg_type]) -> "Track[Seg_type]":
+        """向轨道中批量添加多个片段, 效果与逐个调用`add_segment`相同
 
-        self.segments.append(segment)
+        新片段排序后与已有片段归并, 并以一次线性扫描检查相邻片段是否重叠; 新片段远少于已有片段时则改为逐个二分插入. 所有片段通过检查后才会被加入轨道
+
+        Args:
+            segments (`Iterable[Seg_type]`): 要添加的片段, 无需按时间排序
+
+        Raises:
+            `TypeError`: 有片段类型与轨道类型不匹配
+            `SegmentOverlap`: 新片段之间或与现有片段重叠
+        """
+        new_segments = sorted(segments, key=lambda seg: seg.target_timerange.start)
+        for segment in new_segments:
+            if not isinstance(segment, self.accept_segment_type):
+                raise TypeError("New segment (%s) is not of the same type as the track (%s)" % (type(segment), self.accept_segment_type))
+        if not new_segments:
+            return self
+        if len(new_segments) == 1:
+            return self.add_segment(new_segments[0])
+
+        starts = self._sync_starts()
+        appending = not self.segments or self.segments[-1].target_timerange.end <= new_segments[0].target_timerange.start
+        # 新片段远少于已有片段时, 逐个二分插入比归并整条轨道更快
+        inserting = not appending and len(new_segments) ** 2 <= len(self.segments)
+        if appending or inserting:  # 只需检查新片段之间是否重叠, 与已有片段的重叠在下方逐个检查
+            merged = new_segments
+        else:
+            merged = list(heapq.merge(self.segments, new_segments, key=lambda seg: seg.target_timerange.start))
+
+        new_ids = {id(seg) for seg in new_segments}
+        for prev, seg in zip(merged, merged[1:]):
+            if prev.overlaps(seg):
+                new_seg = seg if id(seg) in new_ids else prev
+                raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
+                                     .format(new_seg.target_timerange.start, new_seg.target_timerange.end))
+
+        if inserting:
+            indices = [bisect.bisect_right(starts, seg.target_timerange.start) for seg in new_segments]
+            for index, seg in zip(indices, new_segments):
+                if any(other.overlaps(seg) for other in self.segments[max(index - 1, 0):index + 1]):
+                    raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
+                                         .format(seg.target_timerange.start, seg.target_timerange.end))
+            for offset, (index, seg) in enumerate(zip(indices, new_segments)):
+                starts.insert(index + offset, seg.target_timerange.start)
+                self.segments.insert(index + offset, seg)
+        elif appending:
+            self.segments.extend(new_segments)
+            starts.extend(seg.target_timerange.start for seg in new_segments)
+        else:
+            self.segments[:] = merged
+            starts[:] = [seg.target_timerange.start for seg in merged]
         return self
 
-    def export_json(self) -> Dict[str, Any]:
-        # 为每个片段写入render_index
-        segment_exports = [seg.export_json() for seg in self.segments]
-        for seg in segment_exports:
-            seg["render_index"] = self.render_index
+    def iter_segment_json(self) -> Iterator[Dict[str, Any]]:
+        """逐个导出片段的JSON数据, 并为每个片段写入render_index"""
+        for seg in self.segments:
+            seg_json = seg.export_json()
+            seg_json["render_index"] = self.render_index
+            yield seg_json
+
+    def export_json(self, *, lazy: bool = False) -> Dict[str, Any]:
+        if lazy:
+            segment_exports: List[Dict[str, Any]] = LazyList(len(self.segments), self.iter_segment_json)
+        else:
+            segment_exports = list(self.iter_segment_json())
 
         return {
             "attribute": int(self.mute),
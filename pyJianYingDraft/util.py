@@ -2,11 +2,112 @@
 
 import inspect
 
-from typing import Union, Type
+from collections import Counter
+from typing import Union, Type, Callable, Iterable, Iterator, SupportsIndex
 from typing import List, Dict, Any
 
 JsonExportable = Union[int, float, bool, str, List["JsonExportable"], Dict[str, "JsonExportable"]]
 
+class LazyList(list):
+    """按需生成元素的列表, 仅用于向`json`模块的编码器提供数据以实现流式写入
+
+    其长度在构造时给定, 元素则在每次迭代时由`factory`重新生成, 不会在内存中保留
+    """
+
+    def __init__(self, length: int, factory: Callable[[], Iterable[Any]]):
+        super().__init__()
+        self._length = length
+        self._factory = factory
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._factory())
+
+class KeyedList(list):
+    """按元素的某一属性(如素材id)建立索引的列表, 可在常数时间内判断是否含有该属性为给定值的元素
+
+    所有修改列表的操作均同步更新索引; 但元素的该属性在其加入列表后不应再改变
+    """
+
+    key_attr: str
+    """用作索引的属性名"""
+
+    def __init__(self, key_attr: str, items: Iterable[Any] = ()):
+        super().__init__(items)
+        self.key_attr = key_attr
+        self._counts: Counter = Counter(getattr(item, key_attr) for item in self)
+
+    def has_key(self, key: Any) -> bool:
+        """列表中是否含有`key_attr`属性为`key`的元素"""
+        return key in self._counts
+
+    def _add(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self._counts[getattr(item, self.key_attr)] += 1
+
+    def _discard(self, items: Iterable[Any]) -> None:
+        for item in items:
+            key = getattr(item, self.key_attr)
+            if self._counts[key] > 1:
+                self._counts[key] -= 1
+            else:
+                del self._counts[key]
+
+    def append(self, item: Any) -> None:
+        super().append(item)
+        self._add((item,))
+
+    def extend(self, items: Iterable[Any]) -> None:
+        items = list(items)
+        super().extend(items)
+        self._add(items)
+
+    def insert(self, index: SupportsIndex, item: Any) -> None:
+        super().insert(index, item)
+        self._add((item,))
+
+    def pop(self, index: SupportsIndex = -1) -> Any:
+        item = super().pop(index)
+        self._discard((item,))
+        return item
+
+    def remove(self, item: Any) -> None:
+        self.pop(self.index(item))
+
+    def clear(self) -> None:
+        super().clear()
+        self._counts.clear()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            value = list(value)
+            old = self[index]
+        else:
+            old = [self[index]]
+        super().__setitem__(index, value)
+        self._discard(old)
+        self._add(value if isinstance(index, slice) else (value,))
+
+    def __delitem__(self, index: Any) -> None:
+        old = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        self._discard(old)
+
+    def __iadd__(self, items: Iterable[Any]) -> "KeyedList":
+        self.extend(items)
+        return self
+
+    def __imul__(self, count: SupportsIndex) -> "KeyedList":
+        super().__imul__(count)
+        self._counts = Counter(getattr(item, self.key_attr) for item in self)
+        return self
+
+    def __reduce_ex__(self, protocol: SupportsIndex) -> Any:
+        # 默认的复制方式会在恢复属性后再逐个追加元素, 使索引重复计数
+        return (self.__class__, (self.key_attr, list(self)))
+
 def provide_ctor_defaults(cls: Type) -> Dict[str, Any]:
     """为构造函数提供默认值，以绕开构造函数的参数限制"""
 
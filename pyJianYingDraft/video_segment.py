@@ -4,14 +4,13 @@
 """
 
 import uuid
-from copy import deepcopy
 
 from typing import Optional, Literal, Union
 from typing import Dict, List, Tuple, Any
 
 from .time_util import tim, Timerange
 from .segment import VisualSegment, ClipSettings
-from .local_materials import VideoMaterial
+from .local_materials import intern_material, VideoMaterial
 from .animation import SegmentAnimations, VideoAnimation
 
 from .metadata import EffectMeta, EffectParamInstance
@@ -275,8 +274,6 @@ class VideoSegment(VisualSegment):
 
     material_instance: VideoMaterial
     """素材实例"""
-    material_size: Tuple[int, int]
-    """素材尺寸"""
 
     effects: List[VideoEffect]
     """特效列表
@@ -318,7 +315,7 @@ class VideoSegment(VisualSegment):
             clip_settings (`ClipSettings`, optional): 图像调节设置, 默认不作任何变换
 
         Raises:
-            `ValueError`: 指定的或计算出的`source_timerange`超出了素材的时长范围
+            `ValueError`: 指定的或计算出的`source_timerange`超出了素材的时长范围. 对时长未知的`LazyVideoMaterial`, 此检查推迟至`check_source_timerange`被调用时进行.
         """
         if isinstance(material, str):
             material = VideoMaterial(material)
@@ -331,19 +328,38 @@ class VideoSegment(VisualSegment):
             speed = speed if speed is not None else 1.0
             source_timerange = Timerange(0, round(target_timerange.duration * speed))
 
-        if source_timerange.end > material.duration:
-            raise ValueError(f"截取的素材时间范围 {source_timerange} 超出了素材时长({material.duration})")
-
         super().__init__(material.material_id, source_timerange, target_timerange, speed, volume, clip_settings=clip_settings)
 
-        self.material_instance = deepcopy(material)
-        self.material_size = (material.width, material.height)
+        # 不在此处读取延迟加载的素材的时长, 相应检查推迟至放入草稿或导出时进行
+        self._source_checked = self._check_source_end(material, force=False)
+        self.material_instance = intern_material(material)  # type: ignore
         self.effects = []
         self.filters = []
         self.transition = None
         self.mask = None
         self.background_filling = None
 
+    @property
+    def material_size(self) -> Tuple[int, int]:
+        """素材尺寸"""
+        return (self.material_instance.width, self.material_instance.height)
+
+    def check_source_timerange(self, *, force: bool = True) -> bool:
+        """检查截取的素材时间范围是否超出了素材时长, 已完成的检查不会重复进行
+
+        Args:
+            force (`bool`, optional): 素材为时长未知的`LazyVideoMaterial`时是否读取素材以完成检查, 否则继续推迟. 默认为是.
+
+        Returns:
+            `bool`: 是否已完成检查
+
+        Raises:
+            `ValueError`: 截取的素材时间范围超出了素材时长
+        """
+        if not self._source_checked:
+            self._source_checked = self._check_source_end(self.material_instance, force)
+        return self._source_checked
+
     def add_animation(self, animation_type: Union[IntroType, OutroType, GroupAnimationType],
                       duration: Optional[Union[int, str]] = None) -> "VideoSegment":
         """将给定的入场/出场/组合动画添加到此片段的动画列表中
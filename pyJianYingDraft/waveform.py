@@ -0,0 +1,168 @@
+"""音频素材波形(`wave_points`)的生成, 需要安装NumPy
+
+以固定大小的块流式解码音频, 并以NumPy的分块归约计算每个波形点所对应的一段采样的峰值, 内存占用与音频长度无关.
+WAV(PCM)文件由标准库`wave`模块直接解码, 其它格式经由ffmpeg解码(优先使用`imageio_ffmpeg`附带的可执行文件).
+计算结果以文件内容id(参见`media_probe.content_id`)为键缓存于内存中, 并可选地写入磁盘缓存目录
+"""
+
+import os
+import wave
+
+from typing import Optional, Iterator, Tuple
+from typing import List, Any
+
+from . import media_probe
+from .cache_util import LruCache, prepare_cache_dir, import_numpy
+
+POINTS_PER_SECOND: int = 30
+"""默认每秒音频所对应的波形点数"""
+
+_CHUNK_FRAMES = 1 << 16
+"""每次解码的帧数"""
+_DECODE_RATE = 44100
+"""经由ffmpeg解码时的采样率"""
+
+_CACHE_DIR: Optional[str] = None
+
+_entries: "LruCache[Tuple[str, int], List[float]]" = LruCache(256)
+"""内存中的波形缓存, 以`(内容id, 每秒点数)`为键"""
+
+def configure(*, max_entries: Optional[int] = None, cache_dir: Optional[str] = "") -> None:
+    """设置波形缓存
+
+    Args:
+        max_entries (`int`, optional): 内存中最多缓存的波形数量, 超出时淘汰最久未使用者; 为0时禁用内存缓存. 不指定则保持不变, 初始为256.
+        cache_dir (`str`, optional): 磁盘缓存目录, 为None时禁用磁盘缓存. 不指定则保持不变, 初始为禁用.
+    """
+    global _CACHE_DIR
+    if max_entries is not None:
+        _entries.resize(max_entries)
+    if cache_dir != "":
+        _CACHE_DIR = prepare_cache_dir(cache_dir)
+
+def clear() -> None:
+    """清空内存中的波形缓存, 磁盘缓存不受影响"""
+    _entries.clear()
+
+def _import_numpy():
+    return import_numpy("生成音频波形")
+
+def _iter_wav(path: str) -> Tuple[int, Iterator[Any]]:
+    """以块为单位解码PCM编码的WAV文件, 返回采样率及各块的单声道峰值采样(已归一化至[0, 1])
+
+    Raises:
+        `wave.Error`: 不是PCM编码的WAV文件
+    """
+    np = _import_numpy()
+    reader = wave.open(path, "rb")
+    rate, channels, width = reader.getframerate(), reader.getnchannels(), reader.getsampwidth()
+
+    def blocks() -> Iterator[Any]:
+        with reader:
+            while True:
+                data = reader.readframes(_CHUNK_FRAMES)
+                if not data:
+                    return
+                if width == 1:
+                    samples = np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0
+                elif width == 3:
+                    raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+                    samples = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8)
+                               | (raw[:, 2].astype(np.int8).astype(np.int32) << 16)).astype(np.float32)
+                else:
+                    samples = np.frombuffer(data, dtype="<i%d" % width).astype(np.float32)
+                samples = np.abs(samples.reshape(-1, channels)).max(axis=1)
+                yield samples / float(1 << (8 * width - 1))
+
+    return rate, blocks()
+
+def _iter_ffmpeg(path: str) -> Tuple[int, Iterator[Any]]:
+    """经由ffmpeg将音频解码为单声道16位PCM, 返回采样率及各块的峰值采样(已归一化至[0, 1])
+
+    Raises:
+        `ValueError`: 未找到ffmpeg, 或解码失败(在迭代时抛出)
+    """
+    np = _import_numpy()
+    exe = media_probe.ffmpeg_exe()
+    if exe is None:
+        raise ValueError("解码非WAV格式的音频需要ffmpeg, 请安装imageio-ffmpeg或将ffmpeg加入PATH")
+
+    def blocks() -> Iterator[Any]:
+        for data in media_probe.stream_ffmpeg(exe, path, ["-vn", "-ac", "1", "-ar", str(_DECODE_RATE), "-f", "s16le"],
+                                              _CHUNK_FRAMES * 2):
+            data = data[:len(data) // 2 * 2]
+            yield np.abs(np.frombuffer(data, dtype="<i2").astype(np.float32)) / 32768.0
+
+    return _DECODE_RATE, blocks()
+
+def _peak_envelope(rate: int, blocks: Iterator[Any], points_per_second: int) -> List[float]:
+    """将各块采样按每个波形点所对应的采样数分组, 取各组的峰值"""
+    np = _import_numpy()
+    group = max(1, round(rate / points_per_second))
+    peaks: List[Any] = []
+    carry = np.empty(0, dtype=np.float32)
+    for block in blocks:
+        if carry.size:
+            block = np.concatenate((carry, block))
+        usable = block.size // group * group
+        if usable:
+            peaks.append(block[:usable].reshape(-1, group).max(axis=1))
+        carry = block[usable:]
+    if carry.size:
+        peaks.append(carry.max(keepdims=True))
+    if not peaks:
+        return []
+    envelope = np.minimum(np.concatenate(peaks), 1.0).astype(np.float64)  # 与从磁盘缓存读取的结果保持一致
+    return np.round(envelope, 4).tolist()
+
+def _disk_path(key: Tuple[str, int]) -> Optional[str]:
+    if _CACHE_DIR is None:
+        return None
+    return os.path.join(_CACHE_DIR, "%s_%d.f32" % key)
+
+def compute_wave_points(path: str, points_per_second: int = POINTS_PER_SECOND) -> List[float]:
+    """计算音频文件的波形, 优先使用缓存
+
+    Args:
+        path (`str`): 音频文件路径, 也可以是含有音轨的视频文件
+        points_per_second (`int`, optional): 每秒音频所对应的波形点数, 默认为`POINTS_PER_SECOND`
+
+    Returns:
+        `List[float]`: 各波形点处的峰值振幅, 取值范围为[0, 1]. 调用者不应修改之
+
+    Raises:
+        `ImportError`: 未安装NumPy
+        `FileNotFoundError`: 文件不存在
+        `ValueError`: 无法解码此文件
+    """
+    if points_per_second <= 0:
+        raise ValueError("points_per_second 必须为正数")
+    path = os.path.abspath(path)
+    key = (media_probe.content_id(path), points_per_second)
+    points = _entries.get(key)
+    if points is not None:
+        return points
+
+    np = _import_numpy()
+    disk_path = _disk_path(key)
+    if disk_path is not None and os.path.exists(disk_path):
+        try:
+            points = np.fromfile(disk_path, dtype="<f4").astype(np.float64).round(4).tolist()
+        except (OSError, ValueError):
+            points = None
+    if points is None:
+        try:
+            rate, blocks = _iter_wav(path)
+        except (wave.Error, EOFError):
+            rate, blocks = _iter_ffmpeg(path)
+        points = _peak_envelope(rate, blocks, points_per_second)
+        if disk_path is not None:
+            tmp_path = "%s.%d.tmp" % (disk_path, os.getpid())
+            try:
+                np.asarray(points, dtype="<f4").tofile(tmp_path)
+                os.replace(tmp_path, disk_path)
+            except OSError:
+                pass  # 磁盘缓存写入失败不影响结果
+
+    _entries.put(key, points)
+    return points
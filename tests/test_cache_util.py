@@ -0,0 +1,25 @@
+import pytest
+
+from pyJianYingDraft.cache_util import LruCache
+
+def test_lru_eviction():
+    cache: LruCache[str, int] = LruCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # a成为最近使用者
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+def test_resize_and_disable():
+    cache: LruCache[str, int] = LruCache(3)
+    for i, key in enumerate("abc"):
+        cache.put(key, i)
+    cache.resize(1)
+    assert len(cache) == 1 and cache.get("c") == 2
+
+    cache.resize(0)
+    cache.put("d", 4)
+    assert cache.get("d") is None
+    with pytest.raises(ValueError):
+        cache.resize(-1)
@@ -0,0 +1,65 @@
+import os
+import json
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import json_patch, trange
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+
+def test_index_draft_values():
+    data = b'{"fps": 30, "materials": {"videos": [{"path": "a\\"b", "id": "x"}]}, "duration": 5}'
+    spans = json_patch.index_draft_values(data)
+    assert data[slice(*spans[("fps",)])] == b"30"
+    assert data[slice(*spans[("materials", "videos", 0, "path")])] == b'"a\\"b"'
+    assert data[slice(*spans[("duration",)])] == b"5"
+
+def test_diff_materials():
+    original = {"videos": [{"id": "a", "path": "old"}], "audios": []}
+    assert json_patch.diff_materials(original, original) == {}
+
+    current = {"videos": [{"id": "a", "path": "new", "extra": 1}], "audios": original["audios"]}
+    assert json_patch.diff_materials(original, current) == {
+        ("materials", "videos", 0, "path"): "new",
+        ("materials", "videos", 0, "extra"): 1,
+    }
+    # 数量变化或字段被删除时无法以补丁方式写入
+    assert json_patch.diff_materials(original, {"videos": [], "audios": []}) is None
+    assert json_patch.diff_materials(original, {"videos": [{"id": "a"}], "audios": []}) is None
+
+def test_splice():
+    assert json_patch.splice(b"0123456789", [(6, 8, b"x"), (1, 1, b"ab"), (3, 4, b"")]) == b"0ab1245x89"
+
+def _make_template(path: str) -> None:
+    script = draft.ScriptFile(1920, 1080)
+    script.add_track(draft.TrackType.video)
+    material = draft.VideoMaterial(os.path.join(ASSET_DIR, "video.mp4"))
+    script.add_segment(draft.VideoSegment(material, trange(0, "1s")))
+    script.add_segment(draft.VideoSegment(material, trange("1s", "1s")))
+    script.dump(path)
+
+def test_patch_save(tmp_path):
+    path = str(tmp_path / "draft_content.json")
+    _make_template(path)
+    with open(path, "rb") as f:
+        original = f.read()
+
+    script = draft.ScriptFile.load_template(path, patch=True)
+    track = script.get_imported_track(draft.TrackType.video, index=0)
+    assert not track.dirty
+    script.save()
+    with open(path, "rb") as f:
+        assert f.read() == original
+
+    # 访问但未修改片段时仍以补丁方式写入
+    assert len(track.segments) == 2
+    assert track.dirty
+    script.save()
+    with open(path, "rb") as f:
+        assert f.read() == original
+
+    # 修改片段后完整导出
+    track.segments[1].target_timerange.start += 500000
+    script.save()
+    with open(path, "rb") as f:
+        saved = json.load(f)
+    assert saved["tracks"][0]["segments"][1]["target_timerange"]["start"] == 1500000
@@ -0,0 +1,38 @@
+import os
+import shutil
+
+import pyJianYingDraft as draft
+from pyJianYingDraft.local_materials import intern_material
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+
+def test_default_crop_not_shared():
+    path = os.path.join(ASSET_DIR, "video.mp4")
+    first = intern_material(draft.VideoMaterial(path))
+    second = draft.VideoMaterial(path)
+    assert second.crop_settings is not first.crop_settings
+    second.crop_settings.upper_left_x = 0.1
+
+def test_intern_tracks_file_changes(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    shutil.copy(os.path.join(ASSET_DIR, "video.mp4"), path)
+    old = intern_material(draft.VideoMaterial(path))
+
+    shutil.copy(os.path.join(ASSET_DIR, "sticker.gif"), path)
+    new = draft.VideoMaterial(path)
+    assert intern_material(new) is new
+    assert new.duration != old.duration
+
+def test_lazy_material_not_probed_by_intern():
+    material = draft.LazyVideoMaterial(os.path.join(ASSET_DIR, "video.mp4"))
+    assert intern_material(material) is material
+    assert not material.is_known("duration")
+
+def test_audio_intern_key_stable_after_wave_points(monkeypatch):
+    from pyJianYingDraft import waveform
+    monkeypatch.setattr(waveform, "compute_wave_points", lambda path, points_per_second: [0.5] * 10)
+
+    material = intern_material(draft.AudioMaterial(os.path.join(ASSET_DIR, "audio.mp3")))
+    key = material._intern_key()
+    material.load_wave_points()
+    assert material._intern_key() == key
@@ -0,0 +1,74 @@
+import os
+import struct
+import wave
+
+from pyJianYingDraft import media_headers
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+def _write(tmp_path, name: str, data: bytes) -> str:
+    path = str(tmp_path / name)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+def _mp4(timescale: int, duration: int, width: int, height: int, *, fragmented: bool = False) -> bytes:
+    tkhd = bytearray(84)
+    struct.pack_into(">II", tkhd, 76, width << 16, height << 16)
+    mdhd = b"\0" * 12 + struct.pack(">II", timescale, duration) + b"\0" * 4
+    hdlr = b"\0" * 8 + b"vide" + b"\0" * 13
+    trak = _box(b"trak", _box(b"tkhd", bytes(tkhd)) + _box(b"mdia", _box(b"mdhd", mdhd) + _box(b"hdlr", hdlr)))
+    moov = trak + (_box(b"mvex", b"") if fragmented else b"")
+    return _box(b"ftyp", b"isom\0\0\0\0") + _box(b"mdat", b"x" * 100) + _box(b"moov", moov)
+
+def _gif(delays) -> bytes:
+    data = b"GIF89a" + struct.pack("<HHBBB", 40, 30, 0x80, 0, 0) + b"\0" * 6  # 2色全局颜色表
+    data += b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00"  # 应用扩展
+    for delay in delays:
+        data += b"\x21\xF9\x04\x00" + struct.pack("<H", delay) + b"\x00\x00"
+        data += b"\x2C" + struct.pack("<HHHHB", 0, 0, 40, 30, 0) + b"\x02" + b"\x03abc\x02de\x00"
+    return data + b"\x3B"
+
+def test_mp4_tkhd_size(tmp_path):
+    path = _write(tmp_path, "a.mp4", _mp4(1000, 2500, 640, 360))
+    assert media_headers.read_video_header(path) == (2500000, 640, 360)
+
+def test_mp4_fragmented_and_truncated(tmp_path):
+    assert media_headers.read_video_header(_write(tmp_path, "f.mp4", _mp4(1000, 2500, 640, 360, fragmented=True))) is None
+    data = _mp4(1000, 2500, 640, 360)
+    assert media_headers.read_video_header(_write(tmp_path, "t.mp4", data[:-20])) is None
+
+def test_real_assets():
+    assert media_headers.read_video_header(os.path.join(ASSET_DIR, "video.mp4")) == (5000000, 2046, 1080)
+    assert media_headers.read_image_header(os.path.join(ASSET_DIR, "sticker.gif")) == (1000000, 312, 259)
+
+def test_wav_duration(tmp_path):
+    path = str(tmp_path / "a.wav")
+    with wave.open(path, "wb") as writer:
+        writer.setnchannels(2)
+        writer.setsampwidth(2)
+        writer.setframerate(8000)
+        writer.writeframes(b"\0\0" * 2 * 12000)
+    assert media_headers.read_audio_header(path) == 1500000
+
+def test_png_and_bmp(tmp_path):
+    png = b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", 320, 200) + b"\x08\x06\0\0\0"
+    assert media_headers.read_image_header(_write(tmp_path, "a.png", png)) == (None, 320, 200)
+    bmp = b"BM" + b"\0" * 12 + struct.pack("<Iii", 40, 17, -9) + b"\0" * 8
+    assert media_headers.read_image_header(_write(tmp_path, "a.bmp", bmp)) == (None, 17, 9)
+
+def test_gif_sums_frame_delays(tmp_path):
+    path = _write(tmp_path, "a.gif", _gif([20, 0]))  # 延迟为0的帧按默认的10计
+    assert media_headers.read_image_header(path) == (300000, 40, 30)
+
+def test_gif_truncated(tmp_path):
+    data = _gif([20, 20])
+    for cut in (10, 20, 40, len(data) - 10):
+        assert media_headers.read_image_header(_write(tmp_path, "t.gif", data[:cut])) is None
+
+def test_unknown_format(tmp_path):
+    assert media_headers.read_image_header(_write(tmp_path, "a.bin", b"hello world")) is None
+    assert media_headers.read_audio_header(_write(tmp_path, "a.bin", b"hello world")) is None
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+import pyJianYingDraft as draft
+from pyJianYingDraft.script_file import ScriptMaterial
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+
+@pytest.fixture
+def videos():
+    path = os.path.join(ASSET_DIR, "video.mp4")
+    return [draft.VideoMaterial(path, material_name="v%d" % i) for i in range(3)]
+
+def test_append_and_pop(videos):
+    va, vb, _ = videos
+    materials = ScriptMaterial()
+    materials.videos.append(va)
+    assert va in materials and vb not in materials
+
+    materials.videos.pop()
+    materials.videos.append(vb)
+    assert va not in materials
+    assert vb in materials
+
+def test_setitem_and_delitem(videos):
+    va, vb, vc = videos
+    materials = ScriptMaterial()
+    materials.videos.extend([va, vb])
+
+    materials.videos[0] = vc
+    assert va not in materials and vc in materials
+
+    materials.videos[1:] = [va]
+    assert vb not in materials and va in materials
+
+    del materials.videos[0]
+    assert vc not in materials and va in materials
+
+def test_duplicates_and_remove(videos):
+    va, _, _ = videos
+    materials = ScriptMaterial()
+    materials.videos += [va, va]
+    materials.videos.remove(va)
+    assert va in materials
+    materials.videos.remove(va)
+    assert va not in materials
+
+def test_reassigned_list(videos):
+    va, vb, _ = videos
+    materials = ScriptMaterial()
+    materials.videos.append(va)
+    materials.videos = [vb]
+    assert va not in materials and vb in materials
+    materials.videos.clear()
+    assert vb not in materials
+
+def test_export_order(videos):
+    materials = ScriptMaterial()
+    for video in reversed(videos):
+        materials.videos.append(video)
+    materials.videos.insert(0, videos[0])
+    exported = materials.export_json()["videos"]
+    assert [mat["id"] for mat in exported] == [v.material_id for v in [videos[0]] + list(reversed(videos))]
+
+def test_invalid_type():
+    with pytest.raises(TypeError):
+        object() in ScriptMaterial()
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import trange
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+VIDEO_PATH = os.path.join(ASSET_DIR, "video.mp4")  # 时长为5秒
+
+def make_script() -> draft.ScriptFile:
+    script = draft.ScriptFile(1920, 1080)
+    script.add_track(draft.TrackType.video)
+    return script
+
+def test_eager_material_checked_on_construction():
+    with pytest.raises(ValueError):
+        draft.VideoSegment(draft.VideoMaterial(VIDEO_PATH), trange(0, "100s"))
+
+def test_lazy_material_checked_on_export():
+    material = draft.LazyVideoMaterial(VIDEO_PATH)
+    script = make_script()
+    script.add_segment(draft.VideoSegment(material, trange(0, "100s")))
+    assert not material.is_known("duration")
+
+    with pytest.raises(ValueError):
+        script.dumps()
+
+def test_lazy_material_checked_on_add_once_probed():
+    material = draft.LazyVideoMaterial(VIDEO_PATH)
+    segment = draft.VideoSegment(material, trange(0, "100s"))
+    material.duration  # 读取素材信息
+
+    script = make_script()
+    with pytest.raises(ValueError):
+        script.add_segment(segment)
+    assert not script.tracks["video"].segments
+
+def test_lazy_material_in_range():
+    material = draft.LazyVideoMaterial(VIDEO_PATH)
+    script = make_script()
+    script.add_segment(draft.VideoSegment(material, trange(0, "2s")))
+    script.dumps()
@@ -0,0 +1,39 @@
+import os
+import copy
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import trange
+from pyJianYingDraft.cow_json import CowDict
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+
+def _load_template(tmp_path) -> draft.ScriptFile:
+    path = str(tmp_path / "draft_content.json")
+    script = draft.ScriptFile(1920, 1080)
+    script.add_track(draft.TrackType.video)
+    script.add_segment(draft.VideoSegment(draft.VideoMaterial(os.path.join(ASSET_DIR, "video.mp4")), trange(0, "1s")))
+    script.dump(path)
+    return draft.ScriptFile.load_template(path)
+
+def test_deepcopy_keeps_cow_raw_data(tmp_path):
+    track = _load_template(tmp_path).get_imported_track(draft.TrackType.video, index=0)
+    copied = copy.deepcopy(track)
+    assert isinstance(copied.raw_data, CowDict)
+    assert all(isinstance(seg.raw_data, CowDict) for seg in copied.segments)
+
+    copied.raw_data["name"] = "copy"
+    copied.segments[0].target_timerange.start = 1000
+    assert track.raw_data["name"] != "copy"
+    assert track.segments[0].target_timerange.start == 0
+
+def test_import_track(tmp_path):
+    source = _load_template(tmp_path)
+    track = source.get_imported_track(draft.TrackType.video, index=0)
+
+    script = draft.ScriptFile(1920, 1080)
+    script.import_track(source, track, offset="1s", new_name="imported")
+    imported = script.imported_tracks[0]
+    assert isinstance(imported.raw_data, CowDict)
+    assert imported.export_json()["name"] == "imported"
+    assert imported.export_json()["segments"][0]["target_timerange"]["start"] == 1000000
+    assert len(script.imported_materials["videos"]) == 1
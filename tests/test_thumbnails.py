@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("imageio")
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import trange, thumbnails
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+
+def test_contact_sheet_keeps_imported_track_clean(tmp_path):
+    path = str(tmp_path / "draft_content.json")
+    script = draft.ScriptFile(1920, 1080)
+    script.add_track(draft.TrackType.video)
+    script.add_segment(draft.VideoSegment(draft.VideoMaterial(os.path.join(ASSET_DIR, "video.mp4")), trange(0, "1s")))
+    script.dump(path)
+
+    template = draft.ScriptFile.load_template(path, lazy=True)
+    track = template.get_imported_track(draft.TrackType.video, index=0)
+    assert not track.dirty
+
+    thumbnails.configure(cache_dir=str(tmp_path / "thumbs"))
+    thumbnails.set_decoder(lambda path, time: np.zeros((36, 64, 3), dtype=np.uint8))  # 无需解码视频
+    try:
+        assert thumbnails.contact_sheet(template, str(tmp_path / "sheet.png"), tile_size=32) == 1
+    finally:
+        thumbnails.set_decoder(None)
+    assert os.path.exists(str(tmp_path / "sheet.png"))
+    assert not track.dirty
@@ -0,0 +1,70 @@
+import pytest
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import trange
+from pyJianYingDraft.exceptions import SegmentOverlap
+from pyJianYingDraft.track import Track
+
+def make_track() -> Track:
+    return Track(draft.TrackType.text, "text", 0, False)
+
+def make_seg(start: str, duration: str) -> draft.TextSegment:
+    return draft.TextSegment("text", trange(start, duration))
+
+def starts(track: Track):
+    return [seg.target_timerange.start for seg in track.segments]
+
+def test_add_segment_keeps_order():
+    track = make_track()
+    track.add_segment(make_seg("4s", "1s")).add_segment(make_seg("0s", "1s")).add_segment(make_seg("2s", "1s"))
+    assert starts(track) == [0, 2000000, 4000000]
+    assert track.end_time == 5000000
+
+def test_add_segment_allows_adjacent():
+    track = make_track()
+    track.add_segment(make_seg("0s", "1s")).add_segment(make_seg("2s", "1s"))
+    track.add_segment(make_seg("1s", "1s"))
+    assert starts(track) == [0, 1000000, 2000000]
+
+def test_add_segment_rejects_overlap():
+    track = make_track()
+    track.add_segment(make_seg("0s", "2s")).add_segment(make_seg("4s", "2s"))
+    for start, duration in (("1s", "1s"), ("3s", "2s"), ("0s", "6s"), ("5s", "1s")):
+        with pytest.raises(SegmentOverlap):
+            track.add_segment(make_seg(start, duration))
+    assert starts(track) == [0, 4000000]
+
+def test_extend_unsorted_and_interleaved():
+    track = make_track()
+    track.add_segment(make_seg("2s", "1s"))
+    track.extend([make_seg("6s", "1s"), make_seg("0s", "2s"), make_seg("3s", "1s")])
+    assert starts(track) == [0, 2000000, 3000000, 6000000]
+
+    track.add_segment(make_seg("4s", "1s"))  # 批量添加后二分查找仍然有效
+    assert starts(track) == [0, 2000000, 3000000, 4000000, 6000000]
+
+def test_extend_rejects_overlap_atomically():
+    track = make_track()
+    track.add_segment(make_seg("2s", "1s"))
+    with pytest.raises(SegmentOverlap):
+        track.extend([make_seg("5s", "1s"), make_seg("0s", "3s")])  # 与现有片段重叠
+    with pytest.raises(SegmentOverlap):
+        track.extend([make_seg("5s", "2s"), make_seg("6s", "1s")])  # 新片段之间重叠
+    assert starts(track) == [2000000]
+
+def test_extend_rejects_wrong_type():
+    track = make_track()
+    with pytest.raises(TypeError):
+        track.extend([make_seg("0s", "1s"), draft.StickerSegment("7226264888031284486", trange("2s", "1s"))])
+    assert track.segments == []
+
+def test_extend_small_batch_into_long_track():
+    track = make_track()
+    track.extend([make_seg("%ds" % (2 * i), "1s") for i in range(20)])
+    track.extend([make_seg("7s", "1s"), make_seg("1s", "1s"), make_seg("3s", "1s")])  # 逐个二分插入
+    assert starts(track) == sorted(starts(track))
+    assert starts(track)[:6] == [0, 1000000, 2000000, 3000000, 4000000, 6000000]
+
+    with pytest.raises(SegmentOverlap):
+        track.extend([make_seg("11s", "1s"), make_seg("13.5s", "1s")])
+    assert len(track.segments) == 23
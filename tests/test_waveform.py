@@ -0,0 +1,30 @@
+import wave
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pyJianYingDraft import waveform
+
+def test_cold_and_cached_points_equal(tmp_path):
+    path = str(tmp_path / "a.wav")
+    rng = random.Random(0)
+    with wave.open(path, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(8000)
+        writer.writeframes(np.array([rng.randint(-32768, 32767) for _ in range(16000)], dtype="<i2").tobytes())
+
+    waveform.configure(cache_dir=str(tmp_path / "cache"))
+    try:
+        cold = waveform.compute_wave_points(path)
+        waveform.clear()
+        cached = waveform.compute_wave_points(path)  # 从磁盘缓存读取
+    finally:
+        waveform.configure(cache_dir=None)
+        waveform.clear()
+
+    assert len(cold) == 60
+    assert cold == cached
+    assert all(point == round(point, 4) for point in cold)